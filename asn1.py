@@ -1,6 +1,20 @@
+import array
+import asyncio
+import collections
+import concurrent.futures
+import functools
+import hashlib
+import importlib
+import io
+import itertools
 import json
+import math
+import mmap
+import os
 import struct
 import sys
+import tempfile
+import threading
 import typing
 from enum import Enum
 
@@ -11,6 +25,17 @@ DBL_MAX = sys.float_info.max
 DBL_MIN = sys.float_info.min
 INFINITY = float('inf')
 NAN = float('nan')
+STREAM_CHUNK_SIZE = 64 * 1024
+EXECUTOR_THRESHOLD = 64 * 1024
+BATCH_CHUNK_SIZE = 1024
+MAX_CONSTRAINED_LENGTH = 0xffff
+UNROLL_LIMIT = 64
+CODEC_FLUSH_BITS = 1024
+CODEC_GENERATOR_VERSION = 7
+INDEX_MAGIC = b'ASN1IDX1'
+INDEX_SUFFIX = '.idx'
+INDEX_ABSENT = 0xffffffffffffffff
+POOL_MAX_STREAMS = 64
 
 
 #############################
@@ -53,17 +78,39 @@ class NotImplementedEncoding(ASN1Error):
         super().__init__(message)
 
 
+class EndOfStream(ASN1Error):
+    def __init__(self, n_bits):
+        message = "Source exhausted, {} more bits required".format(n_bits)
+        super().__init__(message)
+
+        self.n_bits = n_bits
+
+
+class ReadOnlyStream(ASN1Error, TypeError):
+    def __init__(self):
+        message = "Stream is read-only, it decodes directly from a file mapping or an external buffer"
+        super().__init__(message)
+
+
 #############################
 #         bitarray          #
 #############################
 
 
+REVERSED_BYTES = bytes(int('{:08b}'.format(byte)[::-1], 2) for byte in range(256))
+
+
 class bitarray:
+    __slots__ = ('_data', '_bitsize')
+
     def __init__(self, source=None):
         self._data = bytearray()
         self._bitsize = 0
 
-        if isinstance(source, bytearray) or isinstance(source, bytes):
+        if isinstance(source, bitarray):
+            self._init_from_bitarray(source)
+
+        elif isinstance(source, (bytearray, bytes, memoryview)):
             self._init_from_bytes(source)
 
         elif self.__iterable_bits(source):
@@ -83,9 +130,49 @@ class bitarray:
         self._data = bytearray(source)
         self._bitsize = len(self._data) * WORD_SIZE
 
+    def _init_from_bitarray(self, source):
+        self._data = bytearray(source._data[:get_byte_length_from_bit_length(source._bitsize)])
+        self._bitsize = source._bitsize
+
+    @classmethod
+    def frombuffer(cls, source):
+        """
+            Wraps any buffer-protocol object (bytes, memoryview, mmap, array, ...) without copying it.
+
+            The result is read-only: it can be read and sliced, but not modified.
+        """
+
+        result = cls()
+        result._data = memoryview(source).toreadonly().cast('B')
+        result._bitsize = len(result._data) * WORD_SIZE
+
+        return result
+
+    @property
+    def readonly(self):
+        return isinstance(self._data, memoryview)
+
+    def release(self):
+        if self.readonly:
+            self._data.release()
+
+        self.clear()
+
     def set_size(self, new_size):
         self._bitsize = new_size
 
+    def reserve(self, n_bits):
+        """
+            Preallocates zeroed storage for n_bits without changing the length.
+
+            Appends then overwrite the reserved bytes in place instead of growing the bytearray,
+            the unused tail is left out by bytes().
+        """
+
+        n_bytes = get_byte_length_from_bit_length(n_bits) - len(self._data)
+        if n_bytes > 0:
+            self._data.extend(bytes(n_bytes))
+
     def __getitem__(self, item):
         if isinstance(item, slice):
             return self.__get_slice(item)
@@ -116,7 +203,11 @@ class bitarray:
         elif stop >= self._bitsize:
             stop = self._bitsize
 
-        return bitarray([self[i] for i in range(start, stop, item.step or 1)])
+        if (item.step or 1) == 1:
+            n_bits = max(stop - start, 0)
+            return self._from_int(self.get_uint(start, n_bits) if n_bits else 0, n_bits)
+
+        return bitarray([self[i] for i in range(start, stop, item.step)])
 
     def __setitem__(self, item, value):
         self.__assert_correct_index(item)
@@ -131,20 +222,20 @@ class bitarray:
 
     def __delitem__(self, item):
         self.__assert_correct_index(item)
+        item %= self._bitsize
 
-        for i in range(item, self._bitsize - 1):
-            self[i] = self[i + 1]
+        n_tail_bits = self._bitsize - item - 1
+        bits = self._as_int()
+        tail = bits & ((1 << n_tail_bits) - 1)
 
-        self[self._bitsize - 1] = 0
-        self._bitsize -= 1
+        self._assign_int(((bits >> (n_tail_bits + 1)) << n_tail_bits) | tail, self._bitsize - 1)
 
     def __add__(self, other):
         if is_bit(other):
             self.append_bit(int(other))
 
         elif isinstance(other, bytes):
-            for byte in other:
-                self.append_byte(byte)
+            self.append_bytes(other)
 
         elif self.__iterable_bits(other):
             self.__append_bits(other)
@@ -154,6 +245,69 @@ class bitarray:
 
         return self
 
+    def __and__(self, other):
+        return self._from_int(self._as_int() & self.__get_operand(other), self._bitsize)
+
+    def __or__(self, other):
+        return self._from_int(self._as_int() | self.__get_operand(other), self._bitsize)
+
+    def __xor__(self, other):
+        return self._from_int(self._as_int() ^ self.__get_operand(other), self._bitsize)
+
+    def __invert__(self):
+        return self._from_int(~self._as_int(), self._bitsize)
+
+    def __get_operand(self, other):
+        if not isinstance(other, bitarray):
+            other = bitarray(other)
+
+        if len(other) != self._bitsize:
+            raise ValueError("bitarrays of different lengths: {} and {}".format(self._bitsize, len(other)))
+
+        return other._as_int()
+
+    def _as_int(self):
+        """
+            Returns all bits as a single unsigned integer, the first bit being the most significant.
+        """
+
+        return self.get_uint(0, self._bitsize) if self._bitsize else 0
+
+    @staticmethod
+    def _from_int(value, n_bits):
+        result = bitarray()
+        result.append_uint(value, n_bits)
+
+        return result
+
+    def _assign_int(self, value, n_bits):
+        """
+            Replaces the content in place with the n_bits least significant bits of value.
+        """
+
+        padding = -n_bits % WORD_SIZE
+        value &= (1 << n_bits) - 1
+
+        self._data[:] = (value << padding).to_bytes((n_bits + padding) // WORD_SIZE, 'big')
+        self._bitsize = n_bits
+
+    def count(self, value=1):
+        ones = bin(self._as_int()).count('1')
+
+        return ones if int(value) else self._bitsize - ones
+
+    def find(self, pattern, start=0):
+        """
+            Returns the position of the first occurrence of pattern at or after start, or -1.
+
+            pattern can be a bitarray, an iterable of bits or a '0'/'1' string.
+        """
+
+        if not isinstance(pattern, bitarray):
+            pattern = bitarray(pattern)
+
+        return str(self).find(str(pattern), start)
+
     def __eq__(self, other):
         for i, b in enumerate(self):
             if str(b) != str(other[i]):
@@ -162,17 +316,10 @@ class bitarray:
         return True
 
     def __iter__(self):
-        self._n = 0
-        return self
+        data = self._data
 
-    def __next__(self):
-        if self._n < self._bitsize:
-            element = self[self._n]
-            self._n += 1
-            return element
-
-        else:
-            raise StopIteration
+        for position in range(self._bitsize):
+            yield (data[position // WORD_SIZE] >> (WORD_SIZE - position % WORD_SIZE - 1)) & 1
 
     def __len__(self):
         return self._bitsize
@@ -181,54 +328,97 @@ class bitarray:
         return str([bit for bit in self])
 
     def __str__(self):
-        return ''.join([str(bit) for bit in self])
-
-    def __getattr__(self, item):
-        raise AttributeError("'bitarray' object has no attribute '{}'".format(item))
+        return format(self._as_int(), '0{}b'.format(self._bitsize)) if self._bitsize else ''
 
     def append(self, bit):
         self.append_bit(bit)
 
     def append_bit(self, bit):
         self.__assert_bit(bit)
+        self.append_uint(int(bit), 1)
 
-        if self._bitsize % WORD_SIZE:
-            byte = self._data.pop()
-        else:
-            byte = 0b00000000
+    def append_byte(self, byte):
+        self.append_uint(byte, WORD_SIZE)
 
-        bit_position = self.__get_bit_position(self._bitsize)
-        byte = self.__set_bit(byte, bit_position) if int(bit) else self.__clear_bit(byte, bit_position)
+    def append_uint(self, value, n_bits):
+        """
+            Appends the n_bits least significant bits of value (MSB first).
 
-        self._bitsize += 1
-        self._data.append(byte)
+            Pending bits of the last, partially filled byte are loaded into
+            an integer register together with the new bits, and the register
+            is flushed back as whole bytes with a single slice assignment.
+        """
 
-    def append_byte(self, byte):
+        if n_bits <= 0:
+            return
+
+        value &= (1 << n_bits) - 1
+        byte_position = self._bitsize // WORD_SIZE
+        used_bits = self._bitsize % WORD_SIZE
+
+        if used_bits:
+            value |= (self._data[byte_position] >> (WORD_SIZE - used_bits)) << n_bits
+
+        register_size = used_bits + n_bits
+        padding = -register_size % WORD_SIZE
+        n_bytes = (register_size + padding) // WORD_SIZE
+
+        self._data[byte_position:byte_position + n_bytes] = (value << padding).to_bytes(n_bytes, 'big')
+        self._bitsize += n_bits
+
+    def append_bytes(self, source):
         if self._bitsize % WORD_SIZE:
-            old_byte = self._data.pop()
-            bit_position = self.__get_bit_position(self._bitsize)
-            old_byte |= byte >> (WORD_SIZE - bit_position - 1)
-            self._data.append(old_byte)
-            self._data.append((byte << (bit_position + 1)) & 0b11111111)
+            self.append_uint(int.from_bytes(source, 'big'), len(source) * WORD_SIZE)
 
         else:
-            self._data.append(byte)
+            byte_position = self._bitsize // WORD_SIZE
+            self._data[byte_position:byte_position + len(source)] = source
+            self._bitsize += len(source) * WORD_SIZE
+
+    def get_bytes(self, position, n_bytes):
+        if position % WORD_SIZE:
+            return bytearray(self.get_uint(position, n_bytes * WORD_SIZE).to_bytes(n_bytes, 'big'))
+
+        end = position + n_bytes * WORD_SIZE
+        if position < 0 or end > self._bitsize:
+            raise AttributeError("Item {} doesn't exist!".format(end - 1))
 
-        self._bitsize += WORD_SIZE
+        result = self._data[position // WORD_SIZE:end // WORD_SIZE]
+
+        return result if isinstance(result, bytearray) else bytearray(result)
+
+    def get_uint(self, position, n_bits):
+        """
+            Returns n_bits starting at bit position as an unsigned integer (MSB first).
+
+            Only the bytes covering the requested bits are converted with
+            int.from_bytes, the surplus bits are dropped with a shift and a mask.
+        """
+
+        if n_bits <= 0:
+            return 0
+
+        end = position + n_bits
+        if position < 0 or end > self._bitsize:
+            raise AttributeError("Item {} doesn't exist!".format(end - 1))
+
+        value = int.from_bytes(self._data[position // WORD_SIZE:get_byte_length_from_bit_length(end)], 'big')
+
+        return (value >> (-end % WORD_SIZE)) & ((1 << n_bits) - 1)
 
     def insert(self, index, value):
         self.__assert_correct_index(index)
         self.__assert_bit(value)
+        index %= self._bitsize
 
-        self.append_bit(0)
-
-        for i in range(self._bitsize - 1, index, -1):
-            self[i] = self[i - 1]
+        n_tail_bits = self._bitsize - index
+        bits = self._as_int()
+        tail = bits & ((1 << n_tail_bits) - 1)
 
-        self[index] = int(value)
+        self._assign_int(((((bits >> n_tail_bits) << 1) | int(value)) << n_tail_bits) | tail, self._bitsize + 1)
 
     def pop(self, index=None):
-        index = index or self._bitsize - 1
+        index = self._bitsize - 1 if index is None else index
         self.__assert_correct_index(index)
 
         bit = self[index]
@@ -237,7 +427,7 @@ class bitarray:
         return bit
 
     def remove(self, index=None):
-        index = index or self._bitsize - 1
+        index = self._bitsize - 1 if index is None else index
         self.__assert_correct_index(index)
 
         del self[index]
@@ -245,18 +435,24 @@ class bitarray:
         return self
 
     def reverse(self):
-        new = self.copy()
-
-        for i, b in enumerate(self):
-            new[self._bitsize - i - 1] = b
+        n_bytes = get_byte_length_from_bit_length(self._bitsize)
+        reversed_data = bytes(self._data[:n_bytes])[::-1].translate(REVERSED_BYTES)
 
-        return new
+        return self._from_int(int.from_bytes(reversed_data, 'big'), self._bitsize)
 
     def clear(self):
         self._data = bytearray()
         self._bitsize = 0
 
+    @property
+    def capacity(self):
+        return len(self._data)
+
     def bytes(self):
+        n_bytes = get_byte_length_from_bit_length(self._bitsize)
+        if not self.readonly and len(self._data) > n_bytes:
+            return self._data[:n_bytes]
+
         return self._data
 
     def copy(self):
@@ -270,8 +466,32 @@ class bitarray:
     def fromhex(cls, s):
         return bitarray(bytearray.fromhex(s))
 
+    @classmethod
+    def frombytes(cls, source, padding=0):
+        """
+            Creates a bitarray from source, dropping the padding bits from the end of the last byte.
+        """
+
+        if not 0 <= padding < WORD_SIZE or padding > len(source) * WORD_SIZE:
+            raise ValueError("Invalid padding {}".format(padding))
+
+        result = bitarray(bytearray(source))
+        result._bitsize -= padding
+
+        return result
+
+    def tobytes(self, pad=0):
+        """
+            Returns the bits as bytes, the unused bits of the last byte are set to pad.
+        """
+
+        padding = -self._bitsize % WORD_SIZE
+        value = (self._as_int() << padding) | (((1 << padding) - 1) if pad else 0)
+
+        return value.to_bytes((self._bitsize + padding) // WORD_SIZE, 'big')
+
     def hex(self):
-        return self._data.hex()
+        return self.bytes().hex()
 
     def __append_bits(self, bit_iterable):
         for c in bit_iterable:
@@ -351,23 +571,106 @@ def uint_to_int(value, uint_size_in_bytes=4):
 
 
 class BitStream:
+    __slots__ = ('_buffer', '_position', '_mmap')
+
     def __init__(self, buffer=0):
         if isinstance(buffer, BitStream):
             buffer = buffer._buffer
 
-        self._buffer = bitarray(buffer)
-        self._current_byte = 0
-        self._current_bit = 0
+        if isinstance(buffer, bitarray) and buffer.readonly:
+            self._buffer = buffer
+        else:
+            self._buffer = bitarray(buffer)
+
+        self._position = 0
+        self._mmap = None
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        """
+            Creates a read-only stream for decoding directly from a buffer-protocol object.
+
+            Nothing is copied, only the bit cursor is tracked. Streams created from it with
+            BitStream(stream) share the same buffer.
+        """
+
+        bit_stream = cls()
+        bit_stream._buffer = bitarray.frombuffer(buffer)
+
+        return bit_stream
+
+    @classmethod
+    def for_type(cls, type_class):
+        """
+            Creates an empty stream with the worst-case encoding size of type_class preallocated.
+        """
+
+        bit_stream = cls()
+        bit_stream._buffer.reserve(getattr(type_class, 'REQUIRED_BYTES_FOR_ENCODING', 0) * WORD_SIZE)
+
+        return bit_stream
+
+    def from_file(self, filename, use_mmap=False):
+        """
+            Loads the stream from a file into a writable in-memory buffer.
+
+            With use_mmap the file is memory-mapped read-only and decoded directly off the mapping,
+            so only the pages being decoded are resident. Appending to such a stream raises
+            ReadOnlyStream. The mapping, and the open file it holds, is kept until close() is called,
+            so use the stream as a context manager. Empty files cannot be mapped and are loaded as an
+            empty writable buffer even with use_mmap.
+        """
+
+        self.close()
 
-    def from_file(self, filename):
-        file = open(filename, "rb")
-        self._buffer = bitarray(file.read())
-        self._current_byte = 0
-        self._current_bit = 0
+        with open(filename, "rb") as file:
+            if use_mmap and os.fstat(file.fileno()).st_size:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    self._mmap.madvise(mmap.MADV_SEQUENTIAL)
+
+                self._buffer = bitarray.frombuffer(self._mmap)
+
+            else:
+                self._buffer = bitarray(file.read())
+
+        self._position = 0
+
+        return self
 
     def to_file(self, filename):
-        file = open(filename, "wb")
-        file.write(self._buffer.bytes())
+        with open(filename, "wb") as file:
+            file.write(self._buffer.bytes())
+
+    def close(self):
+        if self._mmap is not None:
+            self._buffer.release()
+            self._mmap.close()
+            self._mmap = None
+
+    def reset(self):
+        """
+            Rewinds the cursor and empties the stream, keeping the allocated buffer for reuse.
+
+            Streams reading from an external buffer or a file are detached from it instead.
+        """
+
+        self.close()
+
+        if self._buffer.readonly:
+            self._buffer = bitarray()
+        else:
+            self._buffer.set_size(0)
+
+        self._position = 0
+
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     def __len__(self):
         return len(self._buffer)
@@ -375,17 +678,34 @@ class BitStream:
     def __str__(self):
         return str(self._buffer)
 
+    @property
+    def _current_byte(self):
+        return self._position // WORD_SIZE
+
+    @property
+    def _current_bit(self):
+        return self._position % WORD_SIZE
+
     def _get_current_position(self):
-        return self._current_byte * WORD_SIZE + self._current_bit
+        return self._position
 
     def _increment_bit_counter(self):
-        self._current_bit += 1
-        if self._current_bit == WORD_SIZE:
-            self._current_bit = 0
-            self._current_byte += 1
+        self._position += 1
 
     def _align_to_next_byte(self):
-        self.append_bits_zero(self._current_bit & WORD_SIZE)
+        self.append_bits_zero(-self._position % WORD_SIZE)
+
+    def _skip_to_next_byte(self):
+        self._position += -self._position % WORD_SIZE
+
+    def at_end(self):
+        return self._position >= len(self._buffer)
+
+    def skip(self, n_bits):
+        if self._position + n_bits > len(self._buffer):
+            raise EndOfStream(self._position + n_bits - len(self._buffer))
+
+        self._position += n_bits
 
     def _align_to_next_word(self):
         self.__align_to_n_bytes(2)
@@ -404,83 +724,122 @@ class BitStream:
     # append methods
 
     def append_bit(self, bit):
-        self._buffer.append_bit(bit)
-        self._increment_bit_counter()
+        try:
+            self._buffer.append_bit(bit)
+        except TypeError as error:
+            self._raise_write_error(error)
+
+        self._position += 1
 
     def append_bit_one(self):
-        self.append_bit(1)
+        self.append_uint(1, 1)
 
     def append_bit_zero(self):
-        self.append_bit(0)
+        self.append_uint(0, 1)
 
     def append_bits_one(self, n_bits):
-        for i in range(n_bits):
-            self.append_bit_one()
+        self.append_uint(-1, n_bits)
 
     def append_bits_zero(self, n_bits):
-        for i in range(n_bits):
-            self.append_bit_zero()
+        self.append_uint(0, n_bits)
 
     def append_bits(self, source, n_bits):
+        if isinstance(source, int):
+            self.append_uint(source, n_bits)
+            return
+
         if isinstance(source, bitarray):
             source = source.bytes()
 
-        for byte in source:
-            if n_bits >= WORD_SIZE:
-                self.append_byte(byte)
-                n_bits -= WORD_SIZE
+        source = source[:get_byte_length_from_bit_length(n_bits)]
+        n_bits = min(n_bits, len(source) * WORD_SIZE)
+        value = int.from_bytes(source, 'big') >> (len(source) * WORD_SIZE - n_bits)
 
-            else:
-                self.append_partial_byte(byte, n_bits)
-                break
+        self.append_uint(value, n_bits)
+
+    def append_uint(self, value, n_bits):
+        if n_bits > 0:
+            try:
+                self._buffer.append_uint(value, n_bits)
+            except TypeError as error:
+                self._raise_write_error(error)
+
+            self._position += n_bits
 
     def append_byte(self, byte, negate=False):
         if negate:
             byte = negate_byte(byte)
 
-        self._buffer.append_byte(byte)
-        self._current_byte += 1
+        self.append_uint(byte, WORD_SIZE)
+
+    def append_octets(self, source):
+        try:
+            self._buffer.append_bytes(source)
+        except TypeError as error:
+            self._raise_write_error(error)
+
+        self._position += len(source) * WORD_SIZE
+
+    def _raise_write_error(self, error):
+        if self._buffer.readonly:
+            raise ReadOnlyStream() from error
+
+        raise error
 
     def append_byte_one(self):
-        self._buffer.append_byte(0b11111111)
+        self.append_uint(0b11111111, WORD_SIZE)
 
     def append_byte_zero(self):
-        self._buffer.append_byte(0b00000000)
+        self.append_uint(0b00000000, WORD_SIZE)
 
     def append_partial_byte(self, byte, n_bits, negate=False):
         if negate:
             byte = negate_byte(byte)
 
-        for i in range(n_bits):
-            bit = (byte & 0b10000000) >> (WORD_SIZE - 1)
-            self.append_bit(bit)
-            byte <<= 1
+        self.append_uint(byte >> (WORD_SIZE - n_bits), n_bits)
 
     # read functions
 
-    def read_bit(self):
-        bit = self._buffer[self._get_current_position()]
-        self._increment_bit_counter()
+    def read_uint(self, n_bits):
+        if n_bits <= 0:
+            return 0
 
-        return bit
+        value = self._buffer.get_uint(self._position, n_bits)
+        self._position += n_bits
 
-    def read_byte(self):
-        position = self._get_current_position()
-        byte = int(str(self._buffer[position:position + WORD_SIZE]), 2)
-        self._current_byte += 1
+        return value
+
+    def read_int(self, n_bits):
+        value = self.read_uint(n_bits)
+
+        if n_bits and value >> (n_bits - 1):
+            value -= 1 << n_bits
+
+        return value
+
+    def read_bit(self):
+        return self.read_uint(1)
 
-        return byte
+    def read_byte(self):
+        return self.read_uint(WORD_SIZE)
 
     def read_bits(self, n_bits):
-        result = bytearray()
+        if n_bits <= 0:
+            return bytearray()
 
-        for i in range(n_bits // WORD_SIZE):
-            result.append(self.read_byte())
+        padding = -n_bits % WORD_SIZE
+        value = self.read_uint(n_bits) << padding
 
-        if n_bits % WORD_SIZE:
-            result.append(self.read_partial_byte(n_bits % WORD_SIZE))
+        return bytearray(value.to_bytes((n_bits + padding) // WORD_SIZE, 'big'))
 
-        return result
+    def read_octets(self, n_bytes):
+        if n_bytes <= 0:
+            return bytearray()
+
+        value = self._buffer.get_bytes(self._position, n_bytes)
+        self._position += n_bytes * WORD_SIZE
+
+        return value
 
     def read_bitarray(self, size):
         result = bitarray(self.read_bits(size))
@@ -489,29 +848,13 @@ class BitStream:
         return result
 
     def read_partial_byte(self, n_bits):
-        byte = 0
-        for i in range(n_bits):
-            bit = self.read_bit()
-            byte |= bit << (WORD_SIZE - i - 1)
-
-        return byte
+        return self.read_uint(n_bits) << (WORD_SIZE - n_bits)
 
     def read_bit_pattern(self, pattern, n_bits):
-        value = True
-        n_bytes = n_bits // WORD_SIZE
-        rest_bits = n_bits % WORD_SIZE
-
-        for i in range(n_bytes):
-            byte = self.read_byte()
-            if byte != pattern[i]:
-                value = False
+        n_bytes = get_byte_length_from_bit_length(n_bits)
+        expected = int.from_bytes(pattern[:n_bytes], 'big') >> (n_bytes * WORD_SIZE - n_bits)
 
-        if rest_bits:
-            byte = self.read_partial_byte(rest_bits)
-            if byte != pattern[n_bytes] & 0xFF << (WORD_SIZE - rest_bits):
-                value = False
-
-        return value
+        return self.read_uint(n_bits) == expected
 
     ############
     #   uPER   #
@@ -522,52 +865,67 @@ class BitStream:
     def encode_non_negative_integer32(self, value: int, negate=False):
         bit_length = value.bit_length()
 
-        while bit_length >= WORD_SIZE:
-            byte = (value >> (bit_length - WORD_SIZE)) & 0b11111111
-            self.append_byte(byte, negate)
-            bit_length -= WORD_SIZE
+        if negate:
+            value = ~value
 
-        if bit_length > 0:
-            byte = (value & 0b11111111) << WORD_SIZE - bit_length
-            self.append_partial_byte(byte, bit_length, negate)
+        self.append_uint(value, bit_length)
 
     def encode_non_negative_integer(self, value: int, negate=False):
-        if value < 0x100000000:
-            self.encode_non_negative_integer32(value, negate)
-        else:
-            hi = value >> 32
-            lo = value & 0xffffffff
+        self.encode_non_negative_integer32(value, negate)
 
-            self.encode_non_negative_integer32(hi, negate)
-            lo_bits = lo.bit_length()
-            self.append_bits_zero(32 - lo_bits)
-            self.encode_non_negative_integer32(lo, negate)
+    def encode_constrained(self, value: int, min_value, max_value, aligned=False):
+        """
+            Encodes a constrained whole number (X.691 10.5) as its offset from min_value.
 
-    def encode_constraint_number(self, value: int, min_value, max_value):
-        assert min_value <= value <= max_value
+            The layout for each (min_value, max_value) pair is computed once and cached. With aligned,
+            ranges of 256 and up to 64K are octet-aligned one and two octet fields, and larger ranges
+            use the length-prefixed octet form of the aligned variant.
+        """
+
+        if not min_value <= value <= max_value:
+            raise ConstraintException('Constrained whole number', value, (min_value, max_value), int)
 
-        range_bit_length = int(max_value - min_value).bit_length()
-        value_bit_length = (value - min_value).bit_length()
-        self.append_bits_zero(range_bit_length - value_bit_length)
-        self.encode_non_negative_integer(value - min_value)
+        n_length_bits, n_bits, align = _get_constrained_layout(min_value, max_value, aligned)
+        offset = value - min_value
+
+        if n_bits is None:
+            n_bytes = get_byte_length_from_bit_length(offset.bit_length()) or 1
+            self.append_uint(n_bytes - 1, n_length_bits)
+            n_bits = n_bytes * WORD_SIZE
+
+        if align:
+            self._align_to_next_byte()
+
+        self.append_uint(offset, n_bits)
+
+    def encode_constraint_number(self, value: int, min_value, max_value):
+        self.encode_constrained(value, min_value, max_value)
 
     def encode_semi_constraint_number(self, value: int, min_value):
-        bit_length = (value - min_value).bit_length()
-        value_byte_length = get_byte_length_from_bit_length(bit_length)
-        self.encode_constraint_number(value_byte_length, 0, 255)
-        self.append_bits_zero(value_byte_length * WORD_SIZE - bit_length)
-        self.encode_non_negative_integer(value - min_value)
+        """
+            Encodes the offset from min_value as an octet count followed by the octets, in a single write.
+        """
+
+        offset = value - min_value
+        n_bytes = get_byte_length_from_bit_length(offset.bit_length())
+
+        if offset < 0 or n_bytes > 255:
+            raise ConstraintException('Semi-constrained whole number', value, (min_value, None), int)
+
+        self.append_uint((n_bytes << (n_bytes * WORD_SIZE)) | offset, (n_bytes + 1) * WORD_SIZE)
 
     def encode_number(self, value: int):
-        value_byte_length = get_signed_int_byte_length(value)
-        self.encode_constraint_number(value_byte_length, 0, 255)
+        """
+            Encodes value as an octet count followed by its two's complement octets, in a single write.
+        """
 
-        if value >= 0:
-            self.append_bits_zero(value_byte_length * WORD_SIZE - value.bit_length())
-            self.encode_non_negative_integer(value)
-        else:
-            self.append_bits_one(value_byte_length * WORD_SIZE - (~value).bit_length())
-            self.encode_non_negative_integer((~value), True)
+        n_bytes = get_signed_int_byte_length(value)
+        n_bits = n_bytes * WORD_SIZE
+
+        if n_bytes > 255:
+            raise ConstraintException('Unconstrained whole number', value, (None, None), int)
+
+        self.append_uint((n_bytes << n_bits) | (value & ((1 << n_bits) - 1)), n_bits + WORD_SIZE)
 
     def encode_real(self, value: float):
         """
@@ -596,177 +954,59 @@ class BitStream:
             +-+-+-+-+-+-+-+-+
         """
 
-        header = 0x80
-
-        if value == 0:
-            self.encode_constraint_number(0, 0, 255)
-            return
-        elif value == INFINITY:
-            self.encode_constraint_number(1, 0, 255)
-            self.encode_constraint_number(0x40, 0, 255)
-            return
-        elif value == -INFINITY:
-            self.encode_constraint_number(1, 0, 255)
-            self.encode_constraint_number(0x41, 0, 255)
-            return
-        if value < 0:
-            header |= 0x40
-            value = -value
-
-        from math import floor, log2
-        exponent = int(floor(log2(abs(value))))
-        mantissa = value / 2 ** exponent
-
-        while mantissa != int(mantissa) and mantissa < 4503599627370496:
-            mantissa *= 2
-            exponent -= 1
-
-        mantissa = int(mantissa)
-
-        exp_len = get_signed_int_byte_length(exponent)
-        man_len = get_byte_length_from_bit_length(mantissa.bit_length())
-
-        self.encode_constraint_number(1 + exp_len + man_len, 0, 255)
-        self.encode_constraint_number(header, 0, 255)
-
-        if exponent >= 0:
-            self.append_bits_zero(exp_len * WORD_SIZE - exponent.bit_length())
-            self.encode_non_negative_integer(exponent)
-        else:
-            self.append_bits_one(exp_len * WORD_SIZE - (-exponent - 1).bit_length())
-            self.encode_non_negative_integer((-exponent - 1), True)
-
-        self.append_bits_zero(man_len * WORD_SIZE - mantissa.bit_length())
-        self.encode_non_negative_integer(mantissa)
+        self.append_uint(*_get_real_bits(value))
 
     # decoding
 
     def decode_non_negative_integer32(self, n_bits):
-        value = 0
-
-        while n_bits >= WORD_SIZE:
-            value <<= WORD_SIZE
-            value |= self.read_byte()
-            n_bits -= WORD_SIZE
-
-        if n_bits:
-            value <<= n_bits
-            value |= self.read_partial_byte(n_bits) >> (WORD_SIZE - n_bits)
-
-        return value
+        return self.read_uint(n_bits)
 
     def decode_non_negative_integer(self, n_bits):
-        if n_bits <= 32:
-            value = self.decode_non_negative_integer32(n_bits)
-        else:
-            hi = self.decode_non_negative_integer32(32)
-            lo = self.decode_non_negative_integer32(n_bits - 32)
+        return self.read_uint(n_bits)
 
-            value = hi
-            value <<= n_bits - 32
-            value |= lo
+    def decode_constrained(self, min_value, max_value, aligned=False):
+        n_length_bits, n_bits, align = _get_constrained_layout(min_value, max_value, aligned)
 
-        return value
+        if n_bits is None:
+            n_bits = (self.read_uint(n_length_bits) + 1) * WORD_SIZE
 
-    def decode_constraint_number(self, min_value, max_value):
-        constraint_range = max_value - min_value
-        value = min_value
+        if align:
+            self._skip_to_next_byte()
 
-        if constraint_range != 0:
-            value += self.decode_non_negative_integer(constraint_range.bit_length())
+        return min_value + self.read_uint(n_bits)
 
-        return value
+    def decode_constraint_number(self, min_value, max_value):
+        return self.decode_constrained(min_value, max_value)
 
     def decode_semi_constraint_number(self, min_value):
-        n_bytes = self.decode_constraint_number(0, 255)
-        value = 0
-
-        for i in range(n_bytes):
-            value <<= WORD_SIZE
-            value |= self.read_byte()
-
-        value += min_value
+        n_bytes = self.read_uint(WORD_SIZE)
 
-        return value
+        return self.read_uint(n_bytes * WORD_SIZE) + min_value
 
     def decode_number(self):
-        n_bytes = self.decode_constraint_number(0, 255)
-        value = 0
-
-        for i in range(n_bytes):
-            byte = self.read_byte()
-            if i == 0 and byte > 127:
-                value = -1
-
-            value <<= WORD_SIZE
-            value |= byte
+        n_bytes = self.read_uint(WORD_SIZE)
 
-        return value
+        return self.read_int(n_bytes * WORD_SIZE)
 
     def decode_real(self):
         length = self.read_byte()
-        if length == 0:
-            return 0.0
 
-        header = self.read_byte()
-        if header == 0x40:
-            return INFINITY
-        if header == 0x41:
-            return -INFINITY
-
-        return self.decode_as_binary_encoding(length - 1, header)
+        return _get_real(length, self.read_uint(length * WORD_SIZE))
 
     def decode_as_binary_encoding(self, length, header):
-        if header & 0x40:
-            sign = -1
-        else:
-            sign = 1
+        return _get_real(length + 1, (header << (length * WORD_SIZE)) | self.read_uint(length * WORD_SIZE))
 
-        if header & 0x10:
-            exp_factor = 3
-        elif header & 0x20:
-            exp_factor = 4
-        else:
-            exp_factor = 1
+    ############
+    #   uPER   #
+    ############
 
-        f = (header & 0x0c) >> 2
-        factor = 1 << f
-        exp_len = (header & 0x03) + 1
-        n = 0
-        exponent = 0
+    def acn_get_integer_size_bcd(self, value):
+        result = 0
+        while value > 0:
+            value //= 10
+            result += 1
 
-        for i in range(exp_len):
-            byte = self.read_byte()
-            if i == 0 and byte > 127:
-                exponent = -1
-
-            exponent <<= WORD_SIZE
-            exponent |= byte
-
-        length -= exp_len
-
-        for i in range(length):
-            n <<= WORD_SIZE
-            n |= self.read_byte()
-
-        value = n * factor * pow(2, exp_factor * exponent)
-
-        if sign < 0:
-            value = -value
-
-        return value
-
-    ############
-    #   uPER   #
-    ############
-
-    def acn_get_integer_size_bcd(self, value):
-        result = 0
-        while value > 0:
-            value //= 10
-            result += 1
-
-        return result  # len(str(value))
+        return result  # len(str(value))
 
     def acn_get_integer_size_ascii(self, value):
         if value < 0:
@@ -965,11 +1205,8 @@ class BitStream:
 
     def acn_encode_string_ascii_fix_size(self, value, max_length=None):
         max_length = max_length or len(value)
-        max_length = min(max_length, len(value))
 
-        for i in range(max_length):
-            char = value[i]
-            self.append_byte(ord(char))
+        self.append_octets(value[:max_length].encode('latin-1'))
 
     def acn_encode_string_ascii_null_terminated(self, value, null_character, max_length):
         self.acn_encode_string_ascii_fix_size(value, max_length=max_length)
@@ -979,23 +1216,20 @@ class BitStream:
         self.acn_encode_string_ascii_fix_size(value, max_length=max_length)
 
     def acn_encode_string_ascii_internal_field_determinant(self, value, min_length, max_length):
-        self.encode_constraint_number(min(len(value), max_length), min_length, max_length)
+        self.encode_constrained(min(len(value), max_length), min_length, max_length)
         self.acn_encode_string_ascii_fix_size(value, max_length=max_length)
 
     def acn_encode_string_char_index_fix_size(self, value, allowed_charset, max_length=None):
         max_length = max_length or len(value)
-        max_length = min(max_length, len(value))
+        codec = CharsetCodec.for_alphabet(''.join(allowed_charset), _get_bit_width(0, len(allowed_charset) - 1))
 
-        for i in range(max_length):
-            char = value[i]
-            index = allowed_charset.index(char)
-            self.encode_constraint_number(index, 0, len(allowed_charset) - 1)
+        codec.encode(self, value[:max_length])
 
     def acn_encode_string_char_index_external_field_determinant(self, value, allowed_charset, max_length):
         self.acn_encode_string_char_index_fix_size(value, allowed_charset, max_length=max_length)
 
     def acn_encode_string_char_index_internal_field_determinant(self, value, allowed_charset, min_length, max_length):
-        self.encode_constraint_number(min(len(value), max_length), min_length, max_length)
+        self.encode_constrained(min(len(value), max_length), min_length, max_length)
         self.acn_encode_string_char_index_fix_size(value, allowed_charset, max_length=max_length)
 
     def acn_encode_length(self, value, length_size_in_bits):
@@ -1016,22 +1250,10 @@ class BitStream:
             return self._acn_decode_positive_integer_const_size_big_endian(n_bytes)
 
     def _acn_decode_positive_integer_const_size_big_endian(self, n_bytes):
-        value = 0
-        for i in range(n_bytes):
-            byte = self.read_byte()
-            value <<= WORD_SIZE
-            value |= byte
-
-        return value
+        return self.read_uint(n_bytes * WORD_SIZE)
 
     def _acn_decode_positive_integer_const_size_little_endian(self, n_bytes):
-        value = 0
-        for i in range(n_bytes):
-            byte = self.read_byte()
-            byte <<= (i * WORD_SIZE)
-            value |= byte
-
-        return value
+        return int.from_bytes(self.read_bits(n_bytes * WORD_SIZE), 'little')
 
     def acn_decode_positive_integer_const_size_8(self):
         return self.read_byte()
@@ -1047,37 +1269,11 @@ class BitStream:
 
     def acn_decode_positive_integer_var_size_length_embedded(self):
         n_bytes = self.read_byte()
-        value = 0
-
-        for i in range(n_bytes):
-            byte = self.read_byte()
-            value <<= WORD_SIZE
-            value |= byte
 
-        return value
+        return self.read_uint(n_bytes * WORD_SIZE)
 
     def acn_decode_integer_twos_complement_const_size(self, encoded_size_in_bits):
-        value = 0
-        n_bytes = encoded_size_in_bits // WORD_SIZE
-        rest_bits = encoded_size_in_bits % WORD_SIZE
-
-        for i in range(n_bytes):
-            byte = self.read_byte()
-            if i == 0 and byte > 127:
-                value = -1
-
-            value <<= WORD_SIZE
-            value |= byte
-
-        if rest_bits:
-            byte = self.read_partial_byte(rest_bits)
-            if n_bytes == 0 and byte > 127:
-                value = -1
-
-            value <<= rest_bits
-            value |= byte >> (WORD_SIZE - rest_bits)
-
-        return value
+        return self.read_int(encoded_size_in_bits)
 
     def acn_decode_integer_twos_complement_const_size_8(self, ):
         return uint_to_int(self.acn_decode_positive_integer_const_size_8(), 1)
@@ -1093,24 +1289,14 @@ class BitStream:
 
     def acn_decode_integer_twos_complement_var_size_length_embedded(self):
         n_bytes = self.read_byte()
-        value = 0
-
-        for i in range(n_bytes):
-            byte = self.read_byte()
-            if i == 0 and byte > 127:
-                value = -1
-
-            value <<= WORD_SIZE
-            value |= byte
 
-        return value
+        return self.read_int(n_bytes * WORD_SIZE)
 
     def acn_decode_integer_bcd_const_size(self, encoded_size_in_nibbles):
         result = 0
         for i in range(encoded_size_in_nibbles):
-            digit = self.read_partial_byte(4) >> 4
             result *= 10
-            result += digit
+            result += self.read_uint(4)
 
         return result
 
@@ -1120,25 +1306,20 @@ class BitStream:
 
     def acn_decode_integer_bcd_var_size_null_terminated(self):
         result = 0
-        digit = self.read_partial_byte(4) >> 4
+        digit = self.read_uint(4)
 
         while digit <= 9:
             result *= 10
             result += digit
-            digit = self.read_partial_byte(4) >> 4
+            digit = self.read_uint(4)
 
         return result
 
     def acn_decode_unsigned_integer_ascii_const_size(self, encoded_size_in_bytes):
-        result = 0
-
-        for i in range(encoded_size_in_bytes):
-            digit = self.read_byte()
-            assert ord('0') <= digit <= ord('9')
-            result *= 10
-            result += int(chr(digit))
+        digits = self.read_bits(encoded_size_in_bytes * WORD_SIZE)
+        assert not digits or digits.isdigit()
 
-        return result
+        return int(digits) if digits else 0
 
     def acn_decode_signed_integer_ascii_const_size(self, encoded_size_in_bytes):
         sign = self.read_byte()
@@ -1162,7 +1343,7 @@ class BitStream:
 
         while digit:
             result *= 10
-            result += int(chr(digit))
+            result += digit - ord('0')
             digit = self.read_byte()
 
         return result
@@ -1176,15 +1357,9 @@ class BitStream:
         return sign * result
 
     def acn_decode_real_big_endian(self, format_type='f'):
-        value_bytes = bytearray()
-
-        for _ in bytearray(struct.pack(format_type, 0.0)):
-            value_bytes.append(self.read_byte())
-
-        if self._requires_reverse():
-            value_bytes = bytes(reversed(value_bytes))
+        value_bytes = self.read_bits(struct.calcsize(format_type) * WORD_SIZE)
 
-        return struct.unpack(format_type, value_bytes)[0]
+        return struct.unpack('>' + format_type, value_bytes)[0]
 
     def acn_decode_real_ieee745_32_big_endian(self):
         return self.acn_decode_real_big_endian('f')
@@ -1193,15 +1368,9 @@ class BitStream:
         return self.acn_decode_real_big_endian('d')
 
     def acn_decode_real_little_endian(self, format_type='f'):
-        value_bytes = bytearray()
-
-        for _ in bytearray(struct.pack(format_type, 0.0)):
-            value_bytes.append(self.read_byte())
-
-        if not self._requires_reverse():
-            value_bytes = bytes(reversed(value_bytes))
+        value_bytes = self.read_bits(struct.calcsize(format_type) * WORD_SIZE)
 
-        return struct.unpack(format_type, value_bytes)[0]
+        return struct.unpack('<' + format_type, value_bytes)[0]
 
     def acn_decode_real_ieee745_32_little_endian(self):
         return self.acn_decode_real_little_endian('f')
@@ -1210,12 +1379,7 @@ class BitStream:
         return self.acn_decode_real_little_endian('d')
 
     def acn_decode_string_ascii_fix_size(self, length):
-        result = ''
-        for i in range(length):
-            char = self.read_byte()
-            result += chr(char)
-
-        return result
+        return self.read_octets(length).decode('latin-1')
 
     def acn_decode_string_ascii_null_terminated(self, null_character, max_length):
         result = ''
@@ -1235,22 +1399,19 @@ class BitStream:
         return self.acn_decode_string_ascii_fix_size(min(length, ext_field))
 
     def acn_decode_string_ascii_internal_field_determinant(self, min_length, max_length):
-        length = self.decode_constraint_number(min_length, max_length)
+        length = self.decode_constrained(min_length, max_length)
         return self.acn_decode_string_ascii_fix_size(length)
 
     def acn_decode_string_char_index_fix_size(self, length, allowed_charset):
-        result = ''
-        for i in range(length):
-            index = self.decode_constraint_number(0, len(allowed_charset) - 1)
-            result += allowed_charset[index]
+        codec = CharsetCodec.for_alphabet(''.join(allowed_charset), _get_bit_width(0, len(allowed_charset) - 1))
 
-        return result
+        return codec.decode(self, length)
 
     def acn_decode_string_char_index_external_field_determinant(self, length, allowed_charset, ext_field):
         return self.acn_decode_string_char_index_fix_size(min(length, ext_field), allowed_charset)
 
     def acn_decode_string_char_index_internal_field_determinant(self, allowed_charset, min_length, max_length):
-        length = self.decode_constraint_number(min_length, max_length)
+        length = self.decode_constrained(min_length, max_length)
         return self.acn_decode_string_char_index_fix_size(length, allowed_charset)
 
     def acn_decode_length(self, length_size_in_bits):
@@ -1260,6 +1421,263 @@ class BitStream:
         return 32 if value == 0 else value
 
 
+class BitStreamPool:
+    """
+        Thread-safe pool of reusable encoding streams.
+
+        Streams are kept in buckets by buffer capacity (rounded to powers of two), acquire()
+        returns an empty stream holding at least the requested number of bytes and release()
+        resets it and puts it back, so steady-state encoding allocates no new streams.
+    """
+
+    def __init__(self, max_streams=POOL_MAX_STREAMS):
+        self._max_streams = max_streams
+        self._buckets = collections.defaultdict(list)
+        self._lock = threading.Lock()
+
+    def acquire(self, size=0):
+        """
+            :param size: capacity in bytes, or a type class whose REQUIRED_BYTES_FOR_ENCODING is used
+        """
+
+        if isinstance(size, type):
+            size = getattr(size, 'REQUIRED_BYTES_FOR_ENCODING', 0)
+
+        capacity = 1 << max(size - 1, 0).bit_length()
+
+        with self._lock:
+            bucket = self._buckets.get(capacity)
+            if bucket:
+                return bucket.pop()
+
+        bit_stream = BitStream()
+        bit_stream._buffer.reserve(capacity * WORD_SIZE)
+
+        return bit_stream
+
+    def release(self, bit_stream):
+        bit_stream.reset()
+
+        capacity = bit_stream._buffer.capacity
+        if not capacity:
+            return
+
+        with self._lock:
+            bucket = self._buckets[1 << (capacity.bit_length() - 1)]
+            if len(bucket) < self._max_streams:
+                bucket.append(bit_stream)
+
+    def encode(self, value, encoding=None, *args):
+        """
+            Encodes value with a pooled stream and returns the encoded bytes.
+        """
+
+        bit_stream = self.acquire(type(value))
+
+        try:
+            value.encode(bit_stream, encoding, *args)
+            n_bytes = get_byte_length_from_bit_length(len(bit_stream))
+
+            with memoryview(bit_stream._buffer._data) as data:
+                return data[:n_bytes].tobytes()
+        finally:
+            self.release(bit_stream)
+
+
+class CharsetCodec:
+    """
+        Encoder and decoder of permitted-alphabet strings, built once per alphabet.
+
+        A whole string is turned into its bit pattern with a single str.translate and int(..., 2),
+        and decoded by slicing the binary form of the read bits and mapping each slice to its character.
+    """
+
+    __slots__ = ('alphabet', 'char_width', '_bit_strings', '_chars')
+
+    def __init__(self, alphabet, char_width=None):
+        """
+            :param char_width: bits per character, by default the width of the generated encoders (0 .. len(alphabet))
+        """
+
+        self.alphabet = alphabet
+        self.char_width = len(alphabet).bit_length() if char_width is None else char_width
+
+        bit_format = '0{}b'.format(self.char_width)
+        self._bit_strings = _CharsetTable(alphabet)
+        self._chars = {}
+
+        for index, char in enumerate(alphabet):
+            bit_string = format(index, bit_format)
+            self._bit_strings[ord(char)] = bit_string
+            self._chars[bit_string] = char
+
+    def __repr__(self):
+        return '{}({!r}, {})'.format(type(self).__name__, self.alphabet, self.char_width)
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def for_alphabet(cls, alphabet, char_width=None):
+        return cls(alphabet, char_width)
+
+    @classmethod
+    def for_type(cls, type_class):
+        """
+            Returns the __charset_codec__ of type_class, building it from __alphabet__ when the class
+            does not define one itself. An inherited codec only lends its char_width, and only if the
+            alphabet is unchanged.
+        """
+
+        codec = type_class.__dict__.get('__charset_codec__')
+
+        if codec is None:
+            alphabet = type_class.__alphabet__
+            inherited = getattr(type_class, '__charset_codec__', None)
+            char_width = inherited.char_width if inherited is not None and inherited.alphabet == alphabet else None
+
+            codec = cls.for_alphabet(alphabet, char_width)
+            type_class.__charset_codec__ = codec
+
+        return codec
+
+    def get_bits(self, value):
+        """
+            Returns (bits, n_bits) of the character indexes of value.
+        """
+
+        bits = value.translate(self._bit_strings)
+
+        return int(bits, 2) if bits else 0, len(bits)
+
+    def get_string(self, bits, length, type_class=None):
+        """
+            :param type_class: type reported when bits hold an index outside the alphabet, str by default
+        """
+
+        char_width = self.char_width
+        n_bits = length * char_width
+        bits = format(bits, '0{}b'.format(n_bits))
+
+        try:
+            return ''.join([self._chars[bits[i:i + char_width]] for i in range(0, n_bits, char_width)])
+        except KeyError as e:
+            raise UnexpectedValueException(type_class or str, int(e.args[0], 2))
+
+    def encode(self, bit_stream: BitStream, value):
+        bit_stream.append_uint(*self.get_bits(value))
+
+    def decode(self, bit_stream: BitStream, length, type_class=None):
+        return self.get_string(bit_stream.read_uint(length * self.char_width), length, type_class)
+
+
+class _CharsetTable(dict):
+    """
+        str.translate table rejecting characters outside the alphabet.
+
+        str.translate leaves characters unchanged on LookupError, so __missing__ raises a ConstraintException instead.
+    """
+
+    def __init__(self, alphabet):
+        super().__init__()
+        self.alphabet = alphabet
+
+    def __missing__(self, key):
+        raise ConstraintException('PermittedAlphabet', chr(key), 'FROM({!r})'.format(self.alphabet), str)
+
+
+def _get_real_bits(value):
+    """
+        Returns (bits, n_bits) of the complete uPER REAL encoding of value, length octet included.
+
+        The mantissa is taken from math.frexp and reduced to the odd integer N of value = N * 2^E,
+        the exponent length is stored in the header's two low bits.
+    """
+
+    if value == 0:
+        return 0, WORD_SIZE
+
+    if value != value:
+        return 0x0142, 2 * WORD_SIZE
+
+    if value in (INFINITY, -INFINITY):
+        return 0x0140 | (value < 0), 2 * WORD_SIZE
+
+    header = 0x80
+
+    if value < 0:
+        header |= 0x40
+        value = -value
+
+    mantissa, exponent = math.frexp(value)
+    mantissa = int(mantissa * (1 << 53))
+    trailing_zeros = (mantissa & -mantissa).bit_length() - 1
+    mantissa >>= trailing_zeros
+    exponent += trailing_zeros - 53
+
+    exp_bits = get_signed_int_byte_length(exponent) * WORD_SIZE
+    man_bits = get_byte_length_from_bit_length(mantissa.bit_length()) * WORD_SIZE
+    header |= exp_bits // WORD_SIZE - 1
+    length = 1 + (exp_bits + man_bits) // WORD_SIZE
+
+    bits = (((length << WORD_SIZE) | header) << exp_bits | (exponent & ((1 << exp_bits) - 1))) << man_bits | mantissa
+
+    return bits, (length + 1) * WORD_SIZE
+
+
+def _get_real(length, content):
+    """
+        Decodes the length octets of a REAL, given as a single unsigned integer.
+    """
+
+    if length == 0:
+        return 0.0
+
+    n_bits = (length - 1) * WORD_SIZE
+    header = content >> n_bits
+
+    if header == 0x40:
+        return INFINITY
+    if header == 0x41:
+        return -INFINITY
+    if header == 0x42:
+        return NAN
+
+    exp_bits = ((header & 0x03) + 1) * WORD_SIZE
+    if exp_bits == 4 * WORD_SIZE:
+        n_bits -= WORD_SIZE
+        exp_bits = ((content >> n_bits) & 0xff) * WORD_SIZE
+
+    n_bits -= exp_bits
+    exponent = (content >> n_bits) & ((1 << exp_bits) - 1)
+    if exponent >> (exp_bits - 1):
+        exponent -= 1 << exp_bits
+
+    mantissa = (content & ((1 << n_bits) - 1)) << ((header & 0x0c) >> 2)
+    value = math.ldexp(mantissa, exponent * (3 if header & 0x10 else 4 if header & 0x20 else 1))
+
+    return -value if header & 0x40 else value
+
+
+@functools.lru_cache(maxsize=None)
+def _get_constrained_layout(min_value, max_value, aligned=False):
+    """
+        Returns (n_length_bits, n_bits, align) of a constrained whole number field.
+
+        n_bits is None for the aligned indefinite-length case, where the number of octets - 1
+        is encoded first in n_length_bits.
+    """
+
+    n_values = max_value - min_value + 1
+    width = (n_values - 1).bit_length()
+
+    if not aligned or n_values < 256:
+        return 0, width, False
+
+    if n_values <= 65536:
+        return 0, WORD_SIZE if n_values == 256 else 2 * WORD_SIZE, True
+
+    return (get_byte_length_from_bit_length(width) - 1).bit_length(), None, True
+
+
 #############################
 #           Types           #
 #############################
@@ -1322,15 +1740,26 @@ class ASN1Type:
 
     # Encoding and decoding functions
 
-    def encode(self, bit_stream: BitStream, encoding=None, *args):
+    def encode(self, bit_stream: BitStream = None, encoding=None, *args):
+        """
+            Encodes the value into bit_stream and returns self, like decode() does.
+
+            Without bit_stream there is no stream to hand back, so a new one, preallocated with
+            BitStream.for_type, is created and returned instead of self.
+        """
+
         self.assert_correct_value(self.get())
+        result = self
+
+        if bit_stream is None:
+            bit_stream = result = BitStream.for_type(type(self))
 
         if encoding == 'acn':
             self.acn_encode(bit_stream, *args)
         else:
-            self.uper_encode(bit_stream)
+            CodecPlan.for_type(type(self)).encode(bit_stream, self)
 
-        return self
+        return result
 
     def acn_encode(self, bit_stream: BitStream, *args):
         raise NotImplementedEncoding('acn')
@@ -1342,7 +1771,7 @@ class ASN1Type:
         if encoding == 'acn':
             self.acn_decode(bit_stream, *args)
         else:
-            self.uper_decode(bit_stream)
+            CodecPlan.for_type(type(self)).decode(bit_stream, self)
 
         return self
 
@@ -1352,6 +1781,16 @@ class ASN1Type:
     def uper_decode(self, bit_stream: BitStream):
         raise NotImplementedEncoding('uper')
 
+    @classmethod
+    def uper_skip(cls, bit_stream: BitStream):
+        """
+            Moves the cursor past an encoded value without building it.
+
+            Only presence bits, choice indexes and length determinants are read.
+        """
+
+        CodecPlan.for_type(cls).skip(bit_stream)
+
 
 class ASN1SimpleType(ASN1Type):
     __simple__ = object
@@ -1410,6 +1849,15 @@ class ASN1ComposedType(ASN1Type):
         pass
 
     def __getattr__(self, item):
+        name = item[1:]
+
+        if item.startswith('_') and name in self.__attributes__ and hasattr(type(self), name + 'Type'):
+            # children left out by a codec plan decode are created on first access
+            child = getattr(type(self), name + 'Type')()
+            object.__setattr__(self, item, child)
+
+            return child
+
         raise AttributeError("Attribute {} not exists!".format(item))
 
     def __setattr__(self, key, value):
@@ -1457,36 +1905,50 @@ class ASN1ComposedType(ASN1Type):
 
 class ASN1StringWrappedType(ASN1SimpleType):
     @staticmethod
-    def _wrap_string(wrapped, setter):
+    @functools.lru_cache(maxsize=None)
+    def _wrap_string(wrapped):
+        """
+            Returns the wrapper class for wrapped, built once per wrapped type.
+
+            Mutating methods call back the owner's setter stored on the wrapper instance.
+        """
+
         class _StringWrapper(wrapped):
-            __setter__ = setter
+            __setter__ = None
 
             def __init__(self, *args, **kwargs):
                 if wrapped != str:
                     super().__init__(*args, **kwargs)
-                self._wrap_methods()
 
-            def _mutable_proxy(self, method):
-                def proxy(*args, **kwargs):
-                    method(*args, **kwargs)
-                    self.__setter__(self)
+        def mutable_proxy(method):
+            @functools.wraps(method)
+            def proxy(self, *args, **kwargs):
+                result = method(self, *args, **kwargs)
+                self.__setter__(self)
 
-                return proxy
+                return result
 
-            def _wrap_methods(self):
-                mutable_methods = [
-                    'append', 'clear', 'extend', 'insert', 'lstrip', 'pop', 'remove', 'rstrip', 'strip', '__setitem__'
-                ]
+            return proxy
 
-                for method_name in mutable_methods:
-                    if hasattr(self, method_name):
-                        method = getattr(self, method_name)
-                        setattr(self, method_name, self._mutable_proxy(method))
+        for method_name in ['append', 'clear', 'extend', 'insert', 'lstrip', 'pop', 'remove', 'rstrip', 'strip']:
+            if hasattr(wrapped, method_name):
+                setattr(_StringWrapper, method_name, mutable_proxy(getattr(wrapped, method_name)))
 
         return _StringWrapper
 
     def _set_value(self, value):
-        self._value = self._wrap_string(self.__simple__, self.set)(value)
+        self._value = self._wrap_string(self.__simple__)(value)
+        self._value.__setter__ = self.set
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['_value'] = self.__simple__(self._value)
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._set_value(self._value)
 
     def vars(self):
         return str(self._value)
@@ -1506,6 +1968,9 @@ class ASN1ArrayOfType(ASN1Type, typing.Generic[T]):
         else:
             self._list = self.init_value()
 
+            if isinstance(self._list, int):
+                self._list = self._get_new_list(self._list)
+
         self.set(self._list)
 
     def init_value(self):
@@ -1621,6 +2086,16 @@ class Enumerated(ASN1SimpleType):
     if typing.TYPE_CHECKING:
         def get(self) -> Enum: ...
 
+    def __init_subclass__(cls, **kwargs):
+        """
+            Builds the index -> member and value -> index tables of the subclass once.
+        """
+
+        super().__init_subclass__(**kwargs)
+
+        cls.__enum_members__ = tuple(member for member in cls.Value if member.value is not None)
+        cls.__enum_indexes__ = {member.value: index for index, member in enumerate(cls.__enum_members__)}
+
     def init_value(self):
         enum_values = self._get_values_except_none()
         if enum_values:
@@ -1631,7 +2106,10 @@ class Enumerated(ASN1SimpleType):
         return [e.value for e in self.Value][1:]
 
     def _check_type(self, value):
-        return super()._check_type(value) or value in [e.value for e in self.Value]
+        try:
+            return super()._check_type(value) or value in self.Value._value2member_map_
+        except TypeError:
+            return False
 
     def _set_value(self, value):
         if not isinstance(value, self.Value):
@@ -1642,6 +2120,17 @@ class Enumerated(ASN1SimpleType):
     def vars(self):
         return self._value.value
 
+    def uper_encode(self, bit_stream: BitStream):
+        bit_stream.encode_constrained(self.__enum_indexes__[self._value.value], 0, max(len(self.__enum_members__) - 1, 0))
+
+    def uper_decode(self, bit_stream: BitStream):
+        index = bit_stream.decode_constrained(0, max(len(self.__enum_members__) - 1, 0))
+
+        if index >= len(self.__enum_members__):
+            raise UnexpectedOptionIndex(type(self), index)
+
+        self.set(self.__enum_members__[index])
+
 
 class Null(ASN1SimpleType):
     def __init__(self, source=None):
@@ -1745,6 +2234,10 @@ class NumericString(ASN1StringWrappedType):
 class Sequence(ASN1ComposedType):
     __optionals__ = list()
 
+    def _init_sequence(self, source):
+        if source is not None:
+            self.set(source)
+
     def _init_from_dict(self, source):
         for attribute in self.__attributes__:
             try:
@@ -1765,14 +2258,13 @@ class Set(Sequence):
 
 
 class Choice(ASN1ComposedType):
+    def _init_choice(self, source):
+        if source is not None:
+            self.set(source)
+
     def _init_from_dict(self, source):
         setattr(self, source['name'], source['value'])
 
-    def __setattr__(self, key, value):
-        super().__setattr__(key, value)
-
-        self.set_attribute_exists(key, True)
-
     def set_attribute_exists(self, key, exists: bool):
         if exists:
             for choice in self.__attributes__:
@@ -1787,3 +2279,1803 @@ class SequenceOf(ASN1ArrayOfType, typing.Generic[T]):
 
 class SetOf(ASN1ArrayOfType, typing.Generic[T]):
     pass
+
+
+#############################
+#        Codec plans        #
+#############################
+
+
+class CodecPlan:
+    """
+        uPER encoding of a type class compiled into a tree of primitive ops.
+
+        Every op is a tuple (kind, type_class, *constants, fixed_size) with bounds, bit widths,
+        alphabets and the size in bits of a fixed-size encoding (None if it varies) computed
+        once from the schema declared on the generated classes (__value_range__,
+        __size_range__, __alphabet__, __optionals__), so encoding, skipping and
+        decoding walk the ops instead of dispatching through uper_encode and uper_decode of
+        every child object. Types without a declared schema become 'call' ops, which use
+        their own uper_encode and uper_decode.
+
+        Plans are cached on the type class, see CodecPlan.for_type.
+    """
+
+    def __init__(self, type_class):
+        self.type_class = type_class
+        self.op = _compile_op(type_class)
+
+    @classmethod
+    def for_type(cls, type_class):
+        plan = type_class.__dict__.get('__codec_plan__')
+
+        if plan is None:
+            plan = cls(type_class)
+            type_class.__codec_plan__ = plan
+
+        return plan
+
+    def encode(self, bit_stream: BitStream, value):
+        _encode_op(self.op, bit_stream, value)
+
+    def decode(self, bit_stream: BitStream, value=None):
+        """
+            Decodes into value, or into a new object of the type class if value is None.
+        """
+
+        return _decode_op(self.op, bit_stream, value)
+
+    def skip(self, bit_stream: BitStream):
+        """
+            Moves the cursor past an encoded value, reading only what determines its size.
+        """
+
+        _skip_op(self.op, bit_stream)
+
+    @property
+    def fixed_size(self):
+        """
+            Size in bits of every encoding of the type class, or None if it varies.
+        """
+
+        return self.op[-1]
+
+
+def _get_bit_width(min_value, max_value):
+    return (max_value - min_value).bit_length()
+
+
+def _compile_op(type_class):
+    op = _compile_kind(type_class)
+
+    return op + (_get_fixed_size(op),)
+
+
+def _compile_kind(type_class):
+    if issubclass(type_class, Null):
+        return 'null', type_class
+
+    if issubclass(type_class, Boolean):
+        return 'bool', type_class
+
+    if issubclass(type_class, Real):
+        return 'real', type_class
+
+    if issubclass(type_class, Enumerated):
+        members = type_class.__enum_members__
+
+        return 'enum', type_class, members, type_class.__enum_indexes__, _get_bit_width(0, len(members) - 1)
+
+    value_range = getattr(type_class, '__value_range__', None)
+    if issubclass(type_class, (Integer, PosInteger)) and value_range:
+        min_value, max_value = value_range
+        if min_value is None:
+            max_value = None  # an upper bound alone leaves the number unconstrained
+
+        width = _get_bit_width(min_value, max_value) if max_value is not None else 0
+
+        return 'int', type_class, min_value, max_value, width
+
+    size_range = getattr(type_class, '__size_range__', None)
+    if size_range and size_range[1] <= MAX_CONSTRAINED_LENGTH:
+        min_length, max_length = size_range
+        width = _get_bit_width(min_length, max_length)
+
+        if issubclass(type_class, OctetString):
+            return 'octets', type_class, min_length, max_length, width
+
+        if issubclass(type_class, BitString):
+            return 'bits', type_class, min_length, max_length, width
+
+        alphabet = getattr(type_class, '__alphabet__', None)
+        if issubclass(type_class, (IA5String, NumericString)) and alphabet:
+            codec = CharsetCodec.for_type(type_class)
+
+            return 'chars', type_class, min_length, max_length, width, alphabet, codec, codec.char_width
+
+        if issubclass(type_class, ASN1ArrayOfType):
+            return 'seqof', type_class, min_length, max_length, width, _compile_op(type_class.ElementType)
+
+    if issubclass(type_class, (Sequence, Choice)):
+        names = tuple(type_class().__attributes__)
+
+        if all(hasattr(type_class, name + 'Type') for name in names):
+            children = tuple((name, _compile_op(getattr(type_class, name + 'Type'))) for name in names)
+
+            if issubclass(type_class, Choice):
+                return 'choice', type_class, children, _get_bit_width(0, len(children) - 1)
+
+            optionals = tuple(name for name in names if name in type_class.__optionals__)
+
+            return 'seq', type_class, children, optionals
+
+    return 'call', type_class
+
+
+# encoding
+
+def _encode_op(op, bit_stream, value):
+    _ENCODERS[op[0]](op, bit_stream, value)
+
+
+def _encode_null(op, bit_stream, value):
+    pass
+
+
+def _encode_bool(op, bit_stream, value):
+    bit_stream.append_uint(1 if value._value else 0, 1)
+
+
+def _encode_real(op, bit_stream, value):
+    bit_stream.encode_real(value._value)
+
+
+def _encode_enum(op, bit_stream, value):
+    bit_stream.append_uint(op[3][value._value.value], op[4])
+
+
+def _check_size(op, length):
+    _, type_class, min_length, max_length = op[:4]
+
+    if not min_length <= length <= max_length:
+        raise ConstraintException(type_class.__name__, length, 'SIZE({}..{})'.format(min_length, max_length),
+                                  getattr(type_class, '__simple__', list).__name__)
+
+
+def _encode_int(op, bit_stream, value):
+    _, type_class, min_value, max_value, width = op[:5]
+
+    if max_value is not None:
+        if not min_value <= value._value <= max_value:
+            raise ConstraintException(type_class.__name__, value._value, '{}..{}'.format(min_value, max_value), int)
+
+        bit_stream.append_uint(value._value - min_value, width)
+    elif min_value is not None:
+        bit_stream.encode_semi_constraint_number(value._value, min_value)
+    else:
+        bit_stream.encode_number(value._value)
+
+
+def _encode_octets(op, bit_stream, value):
+    _check_size(op, len(value._value))
+    bit_stream.append_uint(len(value._value) - op[2], op[4])
+    bit_stream.append_octets(value._value)
+
+
+def _encode_bits(op, bit_stream, value):
+    _check_size(op, len(value._value))
+    bit_stream.append_uint(len(value._value) - op[2], op[4])
+    bit_stream.append_bits(value._value, len(value._value))
+
+
+def _encode_chars(op, bit_stream, value):
+    _, _, min_length, _, width, _, codec, _ = op[:8]
+
+    _check_size(op, len(value._value))
+    bit_stream.append_uint(len(value._value) - min_length, width)
+    codec.encode(bit_stream, value._value)
+
+
+def _encode_seqof(op, bit_stream, value):
+    _, _, min_length, _, width, element_op = op[:6]
+    encode = _ENCODERS[element_op[0]]
+
+    _check_size(op, len(value._list))
+    bit_stream.append_uint(len(value._list) - min_length, width)
+    for element in value._list:
+        encode(element_op, bit_stream, element)
+
+
+def _encode_seq(op, bit_stream, value):
+    _, _, children, optionals = op[:4]
+    attributes = value.__attributes__
+
+    for name in optionals:
+        bit_stream.append_uint(1 if attributes[name] else 0, 1)
+
+    for name, child_op in children:
+        if attributes[name]:
+            _ENCODERS[child_op[0]](child_op, bit_stream, getattr(value, '_' + name))
+
+
+def _encode_choice(op, bit_stream, value):
+    _, type_class, children, width = op[:4]
+    attributes = value.__attributes__
+
+    for index, (name, child_op) in enumerate(children):
+        if attributes[name]:
+            bit_stream.append_uint(index, width)
+            _ENCODERS[child_op[0]](child_op, bit_stream, getattr(value, '_' + name))
+
+            return
+
+    raise UnexpectedValueException(type_class, 'NONE')
+
+
+def _encode_call(op, bit_stream, value):
+    value.uper_encode(bit_stream)
+
+
+_ENCODERS = {
+    'null': _encode_null,
+    'bool': _encode_bool,
+    'real': _encode_real,
+    'enum': _encode_enum,
+    'int': _encode_int,
+    'octets': _encode_octets,
+    'bits': _encode_bits,
+    'chars': _encode_chars,
+    'seqof': _encode_seqof,
+    'seq': _encode_seq,
+    'choice': _encode_choice,
+    'call': _encode_call,
+}
+
+
+# decoding
+
+def _decode_op(op, bit_stream, value=None):
+    return _DECODERS[op[0]](op, bit_stream, value)
+
+
+def _set_decoded(type_class, value, decoded):
+    """
+        Stores a decoded simple value, checked with assert_correct_value like set() does.
+    """
+
+    if value is None:
+        value = type_class.__new__(type_class)
+
+    value.assert_correct_value(decoded)
+    value._set_value(decoded)
+
+    return value
+
+
+def _decode_null(op, bit_stream, value):
+    return _set_decoded(op[1], value, None)
+
+
+def _decode_bool(op, bit_stream, value):
+    return _set_decoded(op[1], value, bit_stream.read_uint(1))
+
+
+def _decode_real(op, bit_stream, value):
+    return _set_decoded(op[1], value, bit_stream.decode_real())
+
+
+def _decode_enum(op, bit_stream, value):
+    index = bit_stream.read_uint(op[4])
+
+    if index >= len(op[2]):
+        raise UnexpectedOptionIndex(op[1], index)
+
+    return _set_decoded(op[1], value, op[2][index])
+
+
+def _decode_int(op, bit_stream, value):
+    _, type_class, min_value, max_value, width = op[:5]
+
+    if max_value is not None:
+        decoded = min_value + bit_stream.read_uint(width)
+    elif min_value is not None:
+        decoded = bit_stream.decode_semi_constraint_number(min_value)
+    else:
+        decoded = bit_stream.decode_number()
+
+    return _set_decoded(type_class, value, decoded)
+
+
+def _decode_octets(op, bit_stream, value):
+    length = op[2] + bit_stream.read_uint(op[4])
+
+    return _set_decoded(op[1], value, bit_stream.read_octets(length))
+
+
+def _decode_bits(op, bit_stream, value):
+    length = op[2] + bit_stream.read_uint(op[4])
+
+    return _set_decoded(op[1], value, bit_stream.read_bitarray(length))
+
+
+def _decode_chars(op, bit_stream, value):
+    _, type_class, min_length, _, width, _, codec, _ = op[:8]
+    length = min_length + bit_stream.read_uint(width)
+
+    return _set_decoded(type_class, value, codec.decode(bit_stream, length, type_class))
+
+
+def _decode_seqof(op, bit_stream, value):
+    _, type_class, min_length, _, width, element_op = op[:6]
+    decode = _DECODERS[element_op[0]]
+    length = min_length + bit_stream.read_uint(width)
+
+    if value is None:
+        value = type_class.__new__(type_class)
+
+    elements = [decode(element_op, bit_stream, None) for _ in range(length)]
+    value.assert_correct_value(elements)
+    value._list = elements
+
+    return value
+
+
+def _new_composed(type_class, children, exists):
+    value = type_class.__new__(type_class)
+    value.__attributes__ = dict.fromkeys([name for name, _ in children], exists)
+    value.__initialized__ = True
+
+    return value
+
+
+def _decode_seq(op, bit_stream, value):
+    _, type_class, children, optionals = op[:4]
+
+    if value is None:
+        value = _new_composed(type_class, children, True)
+
+    attributes = value.__attributes__
+    members = value.__dict__
+
+    for name in optionals:
+        attributes[name] = bool(bit_stream.read_uint(1))
+
+    for name, child_op in children:
+        if attributes[name]:
+            key = '_' + name
+            members[key] = _DECODERS[child_op[0]](child_op, bit_stream, members.get(key))
+
+    return value
+
+
+def _decode_choice(op, bit_stream, value):
+    _, type_class, children, width = op[:4]
+    index = bit_stream.read_uint(width)
+
+    if index >= len(children):
+        raise UnexpectedOptionIndex(type_class, index)
+
+    if value is None:
+        value = _new_composed(type_class, children, False)
+
+    name, child_op = children[index]
+    key = '_' + name
+    members = value.__dict__
+    members[key] = _DECODERS[child_op[0]](child_op, bit_stream, members.get(key))
+
+    for attribute in value.__attributes__:
+        value.__attributes__[attribute] = attribute == name
+
+    return value
+
+
+def _decode_call(op, bit_stream, value):
+    if value is None:
+        value = op[1]()
+
+    value.uper_decode(bit_stream)
+
+    return value
+
+
+_DECODERS = {
+    'null': _decode_null,
+    'bool': _decode_bool,
+    'real': _decode_real,
+    'enum': _decode_enum,
+    'int': _decode_int,
+    'octets': _decode_octets,
+    'bits': _decode_bits,
+    'chars': _decode_chars,
+    'seqof': _decode_seqof,
+    'seq': _decode_seq,
+    'choice': _decode_choice,
+    'call': _decode_call,
+}
+
+
+# skipping
+
+def _get_fixed_size(op):
+    kind = op[0]
+
+    if kind == 'null':
+        return 0
+
+    if kind == 'bool':
+        return 1
+
+    if kind == 'enum':
+        return op[4]
+
+    if kind == 'int':
+        return op[4] if op[3] is not None else None
+
+    if kind in ('octets', 'bits', 'chars') and op[2] == op[3]:
+        return op[2] * _get_unit_size(op)
+
+    if kind == 'seqof' and op[2] == op[3]:
+        element_size = op[5][-1]
+
+        return op[2] * element_size if element_size is not None else None
+
+    if kind == 'seq' and not op[3]:
+        sizes = [child_op[-1] for _, child_op in op[2]]
+
+        return sum(sizes) if None not in sizes else None
+
+    return None
+
+
+def _skip_op(op, bit_stream):
+    size = op[-1]
+
+    if size is None:
+        _SKIPPERS[op[0]](op, bit_stream)
+    else:
+        bit_stream.skip(size)
+
+
+def _skip_length_prefixed(op, bit_stream):
+    length = bit_stream.read_byte()
+
+    bit_stream.skip(length * WORD_SIZE)
+
+
+def _get_unit_size(op):
+    if op[0] == 'chars':
+        return op[7]
+
+    return 1 if op[0] == 'bits' else WORD_SIZE
+
+
+def _skip_sized(op, bit_stream):
+    length = op[2] + bit_stream.read_uint(op[4])
+
+    bit_stream.skip(length * _get_unit_size(op))
+
+
+def _skip_seqof(op, bit_stream):
+    _, _, min_length, _, width, element_op = op[:6]
+    length = min_length + bit_stream.read_uint(width)
+    element_size = element_op[-1]
+
+    if element_size is not None:
+        bit_stream.skip(length * element_size)
+    elif element_op[0] in _MEASURABLE_KINDS:
+        bit_stream.skip(_measure_elements(element_op, bit_stream, length))
+    else:
+        skip = _SKIPPERS[element_op[0]]
+
+        for _ in range(length):
+            skip(element_op, bit_stream)
+
+
+def _measure_elements(element_op, bit_stream, length):
+    """
+        Returns the size in bits of length consecutive length-prefixed (or sized) elements.
+
+        Only the prefixes are read, straight from the buffer bytes when they fit in an octet,
+        and the stream position is updated once for the whole run instead of twice per element.
+    """
+
+    if element_op[0] in ('int', 'real'):
+        min_length, width, unit = 0, WORD_SIZE, WORD_SIZE
+    else:
+        min_length, width, unit = element_op[2], element_op[4], _get_unit_size(element_op)
+
+    buffer = bit_stream._buffer
+    data, bit_size = buffer._data, len(buffer)
+    start = position = bit_stream._position
+
+    if width > WORD_SIZE:
+        for _ in range(length):
+            position += width + (min_length + buffer.get_uint(position, width)) * unit
+
+        return position - start
+
+    mask = (1 << width) - 1
+
+    for _ in range(length):
+        end = position + width
+        if end > bit_size:
+            raise EndOfStream(end - bit_size)
+
+        index = position >> 3
+        window = data[index] << WORD_SIZE | (data[index + 1] if end > (index + 1) * WORD_SIZE else 0)
+        position = end + (min_length + ((window >> (2 * WORD_SIZE - end + index * WORD_SIZE)) & mask)) * unit
+
+    return position - start
+
+
+def _skip_seq(op, bit_stream):
+    _, _, children, optionals = op[:4]
+    present = {name: bit_stream.read_uint(1) for name in optionals}
+
+    for name, child_op in children:
+        if present.get(name, True):
+            _skip_op(child_op, bit_stream)
+
+
+def _skip_choice(op, bit_stream):
+    _, type_class, children, width = op[:4]
+    index = bit_stream.read_uint(width)
+
+    if index >= len(children):
+        raise UnexpectedOptionIndex(type_class, index)
+
+    _skip_op(children[index][1], bit_stream)
+
+
+def _skip_call(op, bit_stream):
+    type_class = op[1]
+
+    if type_class.uper_skip.__func__ is not ASN1Type.uper_skip.__func__:
+        type_class.uper_skip(bit_stream)
+    else:
+        type_class().uper_decode(bit_stream)  # no schema to skip by, the value has to be decoded
+
+
+_MEASURABLE_KINDS = frozenset(['int', 'real', 'octets', 'bits', 'chars'])
+
+_SKIPPERS = {
+    'int': _skip_length_prefixed,
+    'real': _skip_length_prefixed,
+    'octets': _skip_sized,
+    'bits': _skip_sized,
+    'chars': _skip_sized,
+    'seqof': _skip_seqof,
+    'seq': _skip_seq,
+    'choice': _skip_choice,
+    'call': _skip_call,
+}
+
+
+#############################
+#      Code generation      #
+#############################
+
+
+class CompiledCodec:
+    """
+        Straight-line uPER encode and decode functions generated for a type class.
+
+        They work on plain Python values shaped like vars() of the type (dict for SEQUENCE,
+        {alternative: value} for CHOICE, list, int, float, bool, None, bytes, str, and a string
+        of '0' and '1' for BIT STRING), so no ASN1Type objects are created. Enumerated values
+        are their numbers; names are accepted too when encoding.
+
+        decode(data, pos=0) starts reading at bit position pos of data.
+    """
+
+    def __init__(self, type_class, source, filename='<asn1 codec>'):
+        self.type_class = type_class
+        self.source = source
+
+        namespace = {}
+        exec(compile(source, filename, 'exec'), namespace)
+
+        self.encode = namespace['encode']
+        self.decode = namespace['decode']
+
+
+def compile_codec(type_class, cache_dir=None):
+    """
+        Generates (via exec) the CompiledCodec of type_class and caches it on the class.
+
+        Children are inlined, bits are collected in a local integer accumulator, and
+        SEQUENCE OF with a fixed size of up to UNROLL_LIMIT elements is unrolled. With
+        cache_dir the generated module is stored there and reused as long as the schema
+        fingerprint in its first line matches.
+    """
+
+    codec = type_class.__dict__.get('__compiled_codec__')
+    if codec is not None:
+        return codec
+
+    generator = _CodecGenerator(CodecPlan.for_type(type_class).op)
+    source = None
+
+    if cache_dir is not None:
+        filename = os.path.join(cache_dir, '{}.{}.py'.format(type_class.__module__, type_class.__qualname__))
+
+        try:
+            with open(filename) as file:
+                source = file.read()
+        except OSError:
+            pass
+
+        if source is None or source.split('\n', 1)[0] != generator.header:
+            source = generator.generate()
+
+            os.makedirs(cache_dir, exist_ok=True)
+            _write_atomic(filename, source)
+    else:
+        filename = '<asn1 codec {}>'.format(type_class.__qualname__)
+        source = generator.generate()
+
+    codec = CompiledCodec(type_class, source, filename)
+    type_class.__compiled_codec__ = codec
+
+    return codec
+
+
+def _write_atomic(filename, source):
+    """
+        Writes source next to filename and renames it into place, so that concurrent
+        readers see either the previous file or the complete new one.
+    """
+
+    fd, temp_name = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(filename))
+
+    try:
+        with os.fdopen(fd, 'w') as file:
+            file.write(source)
+
+        os.replace(temp_name, filename)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+
+
+def decode_to_python(type_class, data):
+    """
+        Decodes a uPER encoded value of type_class from a bytes-like object straight into
+        plain Python values (dict, list, int, float, bool, None, bytes, str).
+
+        The result has the shape of vars() of the decoded object, except that OCTET STRING
+        values stay bytes. No ASN1Type objects are built and no constraints are re-checked.
+    """
+
+    return compile_codec(type_class).decode(data)
+
+
+def encode_from_python(type_class, value, encoding='uper'):
+    """
+        Encodes plain Python values shaped like vars() of type_class, without building
+        ASN1Type objects, and returns the encoding padded to whole octets.
+
+        Ranges, sizes, alphabets and CHOICE alternatives are checked once, while the bits
+        are written, and so is the check_constraints of every type that defines one.
+        ENUMERATED values may be given by number or by name.
+    """
+
+    if encoding not in (None, 'uper'):
+        raise NotImplementedEncoding(encoding)
+
+    return compile_codec(type_class).encode(value)
+
+
+class _CodecGenerator:
+    def __init__(self, op):
+        self._op = op
+        self._lines = []
+        self._indent = 1
+        self._counter = 0
+        self._modules = {}
+        self._types = {}
+        self._checks = {}
+
+        fingerprint = hashlib.sha1('{}:{!r}'.format(CODEC_GENERATOR_VERSION, op).encode()).hexdigest()
+        self.header = '# asn1 codec for {}.{} {}'.format(op[1].__module__, op[1].__qualname__, fingerprint)
+
+    def generate(self):
+        self._stream = False
+        self._emit('out = bytearray()')
+        self._emit('acc = 0')
+        self._emit('n = 0')
+        self._encode(self._op, 'value')
+        self._emit('r = -n & 7')
+        self._emit("out += (acc << r).to_bytes((n + r) >> 3, 'big')")
+        self._emit("return bytes(out) or b'\\x00'")
+        encode = self._lines
+
+        if self._stream:
+            encode.insert(0, '    stream = asn1.BitStream()')
+
+        self._lines = []
+        self._stream = False
+        result = self._decode(self._op)
+        self._emit('if pos > len(data) * 8:')
+        self._emit('    raise asn1.EndOfStream(pos - len(data) * 8)')
+        self._emit('return ' + result)
+        decode = self._lines
+
+        if self._stream:
+            decode.insert(0, '    stream = asn1.BitStream.from_buffer(data)')
+
+        lines = [self.header, '', 'import asn1' if __name__ == 'asn1' else 'import {} as asn1'.format(__name__)]
+        lines += ['import {} as {}'.format(module, alias) for module, alias in self._modules.items()]
+
+        if self._types:
+            lines += [''] + ['{} = {}'.format(alias, path) for path, alias in self._types.values()]
+            lines += ['{} = {}().check_constraints'.format(alias, self._types[type_class][1])
+                      for type_class, alias in self._checks.items()]
+
+        lines += ['', '', 'def encode(value):'] + encode + ['', '', 'def decode(data, pos=0):'] + decode
+
+        return '\n'.join(lines) + '\n'
+
+    def _emit(self, line):
+        self._lines.append('    ' * self._indent + line)
+
+    def _name(self, prefix):
+        self._counter += 1
+
+        return '{}{}'.format(prefix, self._counter)
+
+    def _type(self, type_class):
+        if type_class not in self._types:
+            module = self._modules.setdefault(type_class.__module__, '_m{}'.format(len(self._modules)))
+            self._types[type_class] = ('{}.{}'.format(module, type_class.__qualname__), self._name('_t'))
+
+        return self._types[type_class][1]
+
+    def _check(self, type_class):
+        if type_class not in self._checks:
+            self._type(type_class)
+            self._checks[type_class] = self._name('_c')
+
+        return self._checks[type_class]
+
+    def _append(self, value, width):
+        if isinstance(width, int) and width == 0:
+            return
+
+        self._emit('acc = (acc << {}) | {}'.format(width, value))
+        self._emit('n += {}'.format(width))
+
+    def _append_bits(self, function, *args):
+        bits, width = self._name('b'), self._name('w')
+
+        self._emit('{}, {} = asn1.{}({})'.format(bits, width, function, ', '.join(args)))
+        self._append(bits, width)
+
+    def _flush(self):
+        self._emit('if n > {}:'.format(CODEC_FLUSH_BITS))
+        self._emit('    r = n & 7')
+        self._emit("    out += (acc >> r).to_bytes((n - r) >> 3, 'big')")
+        self._emit('    acc &= (1 << r) - 1')
+        self._emit('    n = r')
+
+    def _raise_constraint(self, type_class, value, constraints):
+        self._emit('    raise asn1.ConstraintException({!r}, {}, {!r}, {!r})'.format(
+            type_class.__name__, value, constraints, getattr(type_class, '__simple__', list).__name__
+        ))
+
+    def _check_constraints(self, op, value):
+        type_class = op[1]
+        if type_class.check_constraints is ASN1Type.check_constraints:
+            return
+
+        self._emit('if not {}({}):'.format(self._check(type_class), value))
+        self._raise_constraint(type_class, 'len({})'.format(value) if op[0] == 'seqof' else value,
+                               type_class.__constraints__)
+
+    def _check_length(self, op, length):
+        _, type_class, min_length, max_length = op[:4]
+
+        self._emit('if not {} <= {} <= {}:'.format(min_length, length, max_length))
+        self._raise_constraint(type_class, length, 'SIZE({}..{})'.format(min_length, max_length))
+
+    # encoding
+
+    def _encode_block(self, op, expr):
+        self._indent += 1
+        start = len(self._lines)
+        self._encode(op, expr)
+
+        if len(self._lines) == start:
+            self._emit('pass')
+
+        self._indent -= 1
+
+    def _encode(self, op, expr):
+        kind = op[0]
+        if kind == 'null':
+            return
+
+        value = expr
+        if not expr.isidentifier():
+            value = self._name('x')
+            self._emit('{} = {}'.format(value, expr))
+
+        if kind in ('int', 'real', 'octets', 'bits', 'chars', 'seqof'):
+            self._check_constraints(op, value)
+
+        getattr(self, '_encode_' + kind)(op, value)
+
+    def _encode_bool(self, op, value):
+        self._append('(1 if {} else 0)'.format(value), 1)
+
+    def _encode_real(self, op, value):
+        self._append_bits('_get_real_bits', 'float({})'.format(value))
+
+    def _encode_enum(self, op, value):
+        indexes = {}
+        for index, member in enumerate(op[2]):
+            indexes[member.value] = indexes[member.name] = index
+
+        index = self._name('i')
+        self._emit('{} = {!r}.get({})'.format(index, indexes, value))
+        self._emit('if {} is None:'.format(index))
+        self._raise_constraint(op[1], value, ', '.join(member.name for member in op[2]))
+        self._append(index, op[4])
+
+    def _encode_int(self, op, value):
+        _, type_class, min_value, max_value, width = op[:5]
+
+        if max_value is None:
+            self._encode_length_prefixed_int(op, value)
+            return
+
+        self._emit('if not {} <= {} <= {}:'.format(min_value, value, max_value))
+        self._raise_constraint(type_class, value, '{}..{}'.format(min_value, max_value))
+        self._append('({} - {})'.format(value, min_value), width)
+
+    def _encode_length_prefixed_int(self, op, value):
+        _, type_class, min_value = op[:3]
+        length = self._name('l')
+
+        if min_value is None:
+            self._emit('{} = asn1.get_signed_int_byte_length({})'.format(length, value))
+            self._emit('if {} > 255:'.format(length))
+            self._raise_constraint(type_class, value, 'MIN..MAX')
+            bits = '({} & ((1 << ({} << 3)) - 1))'.format(value, length)
+        else:
+            offset = self._name('o')
+            self._emit('{} = {} - {}'.format(offset, value, min_value))
+            self._emit('{} = ({}.bit_length() + 7) >> 3'.format(length, offset))
+            self._emit('if {} < 0 or {} > 255:'.format(offset, length))
+            self._raise_constraint(type_class, value, '{}..MAX'.format(min_value))
+            bits = offset
+
+        self._append(length, WORD_SIZE)
+        self._append(bits, '({} << 3)'.format(length))
+        self._flush()
+
+    def _encode_octets(self, op, value):
+        length = self._name('l')
+
+        self._emit('{} = len({})'.format(length, value))
+        self._check_length(op, length)
+        self._append('({} - {})'.format(length, op[2]), op[4])
+        self._append("int.from_bytes({}, 'big')".format(value), '({} << 3)'.format(length))
+        self._flush()
+
+    def _encode_bits(self, op, value):
+        length = self._name('l')
+
+        self._emit('{0} = str({0})'.format(value))
+        self._emit('{} = len({})'.format(length, value))
+        self._check_length(op, length)
+        self._append('({} - {})'.format(length, op[2]), op[4])
+        self._emit('if {}:'.format(length))
+        self._emit('    acc = (acc << {}) | int({}, 2)'.format(length, value))
+        self._emit('    n += {}'.format(length))
+        self._flush()
+
+    def _encode_chars(self, op, value):
+        _, type_class, min_length, _, width, alphabet, _, char_width = op[:8]
+        length = self._name('l')
+
+        self._emit('{} = len({})'.format(length, value))
+        self._check_length(op, length)
+        self._append('({} - {})'.format(length, min_length), width)
+        self._append_bits('CharsetCodec.for_type({}).get_bits'.format(self._type(type_class)), value)
+        self._flush()
+
+    def _encode_seqof(self, op, value):
+        _, _, min_length, max_length, width, element_op = op[:6]
+        length = self._name('l')
+
+        self._emit('{} = len({})'.format(length, value))
+        self._check_length(op, length)
+        self._append('({} - {})'.format(length, min_length), width)
+
+        if min_length == max_length <= UNROLL_LIMIT:
+            for i in range(max_length):
+                self._encode(element_op, '{}[{}]'.format(value, i))
+
+            self._flush()
+        else:
+            element = self._name('e')
+
+            self._emit('for {} in {}:'.format(element, value))
+            self._encode_block(element_op, element)
+            self._indent += 1
+            self._flush()
+            self._indent -= 1
+
+    def _encode_seq(self, op, value):
+        _, _, children, optionals = op[:4]
+
+        for name in optionals:
+            self._append('(1 if {!r} in {} else 0)'.format(name, value), 1)
+
+        for name, child_op in children:
+            if name in optionals:
+                self._emit('if {!r} in {}:'.format(name, value))
+                self._encode_block(child_op, '{}[{!r}]'.format(value, name))
+            else:
+                self._encode(child_op, '{}[{!r}]'.format(value, name))
+
+    def _encode_choice(self, op, value):
+        _, type_class, children, width = op[:4]
+        name, child = self._name('k'), self._name('y')
+
+        self._emit('({}, {}), = {}.items()'.format(name, child, value))
+
+        for index, (child_name, child_op) in enumerate(children):
+            self._emit('{} {} == {!r}:'.format('if' if index == 0 else 'elif', name, child_name))
+            self._indent += 1
+            self._append(index, width)
+            self._indent -= 1
+            self._encode_block(child_op, child)
+
+        self._emit('else:')
+        self._emit('    raise asn1.UnexpectedValueException({}, {})'.format(self._type(type_class), name))
+
+    def _encode_call(self, op, value):
+        self._stream = True
+        self._append_bits('_encode_call_to_bits', 'stream', self._type(op[1]), value)
+
+    # decoding
+
+    def _read(self, width):
+        if isinstance(width, int) and width == 0:
+            return '0'
+
+        if isinstance(width, int):
+            end, mask = width + 7, (1 << width) - 1
+        else:
+            end, mask = '{} + 7'.format(width), '((1 << {}) - 1)'.format(width)
+
+        value = self._name('u')
+        self._emit("{} = (int.from_bytes(data[pos >> 3:(pos + {}) >> 3], 'big') >> (-(pos + {}) & 7)) & {}".format(
+            value, end, width, mask
+        ))
+        self._emit('pos += {}'.format(width))
+
+        return value
+
+    def _decode(self, op):
+        return getattr(self, '_decode_' + op[0])(op)
+
+    def _decode_null(self, op):
+        return 'None'
+
+    def _decode_bool(self, op):
+        return 'bool({})'.format(self._read(1))
+
+    def _decode_real(self, op):
+        length = self._read(WORD_SIZE)
+
+        return 'asn1._get_real({}, {})'.format(length, self._read('({} * 8)'.format(length)))
+
+    def _decode_enum(self, op):
+        _, type_class, members, _, width = op[:5]
+        index = self._read(width)
+
+        self._emit('if {} >= {}:'.format(index, len(members)))
+        self._emit('    raise asn1.UnexpectedOptionIndex({}, {})'.format(self._type(type_class), index))
+
+        return '{!r}[{}]'.format(tuple(member.value for member in members), index)
+
+    def _decode_int(self, op):
+        _, _, min_value, max_value, width = op[:5]
+
+        if max_value is None:
+            length = self._read(WORD_SIZE)
+            width = '({} * 8)'.format(length)
+            bits = self._read(width)
+
+            if min_value is None:
+                return '{0} - (1 << {1}) if {2} and {0} >> ({1} - 1) else {0}'.format(bits, width, length)
+
+            return '{} + {}'.format(min_value, bits)
+
+        return '{} + {}'.format(min_value, self._read(width))
+
+    def _decode_length(self, op):
+        if not op[4]:
+            return str(op[2])
+
+        length = self._name('l')
+        self._emit('{} = {} + {}'.format(length, op[2], self._read(op[4])))
+
+        return length
+
+    def _decode_octets(self, op):
+        length = self._decode_length(op)
+        value = self._name('v')
+
+        self._emit('{} = asn1._get_octets(data, pos, {})'.format(value, length))
+        self._emit('pos += {} << 3'.format(length))
+
+        return value
+
+    def _decode_bits(self, op):
+        length = self._decode_length(op)
+        bits = self._read(length)
+
+        return "format({}, '0{{}}b'.format({})) if {} else ''".format(bits, length, length)
+
+    def _decode_chars(self, op):
+        _, type_class, _, _, _, _, _, char_width = op[:8]
+        length = self._decode_length(op)
+        bits = self._read('({} * {})'.format(length, char_width))
+
+        type_name = self._type(type_class)
+
+        return 'asn1.CharsetCodec.for_type({0}).get_string({1}, {2}, {0})'.format(type_name, bits, length)
+
+    def _decode_seqof(self, op):
+        _, _, min_length, max_length, _, element_op = op[:6]
+        value = self._name('v')
+
+        if min_length == max_length <= UNROLL_LIMIT:
+            elements = [self._decode(element_op) for _ in range(max_length)]
+            self._emit('{} = [{}]'.format(value, ', '.join(elements)))
+
+            return value
+
+        length = self._decode_length(op)
+
+        self._emit('{} = []'.format(value))
+        self._emit('for _ in range({}):'.format(length))
+        self._indent += 1
+        self._emit('{}.append({})'.format(value, self._decode(element_op)))
+        self._indent -= 1
+
+        return value
+
+    def _decode_seq(self, op):
+        _, _, children, optionals = op[:4]
+        value = self._name('v')
+        present = {name: self._read(1) for name in optionals}
+
+        self._emit('{} = {{}}'.format(value))
+
+        for name, child_op in children:
+            if name in present:
+                self._emit('if {}:'.format(present[name]))
+                self._indent += 1
+                self._emit('{}[{!r}] = {}'.format(value, name, self._decode(child_op)))
+                self._indent -= 1
+            else:
+                self._emit('{}[{!r}] = {}'.format(value, name, self._decode(child_op)))
+
+        return value
+
+    def _decode_choice(self, op):
+        _, type_class, children, width = op[:4]
+        index = self._read(width)
+        value = self._name('v')
+
+        for i, (name, child_op) in enumerate(children):
+            self._emit('{} {} == {}:'.format('if' if i == 0 else 'elif', index, i))
+            self._indent += 1
+            self._emit('{} = {{{!r}: {}}}'.format(value, name, self._decode(child_op)))
+            self._indent -= 1
+
+        self._emit('else:')
+        self._emit('    raise asn1.UnexpectedOptionIndex({}, {})'.format(self._type(type_class), index))
+
+        return value
+
+    def _decode_call(self, op):
+        value = self._name('v')
+
+        self._stream = True
+        self._emit('{}, pos = asn1._decode_call(stream, pos, {})'.format(value, self._type(op[1])))
+
+        return value
+
+
+def _encode_call_to_bits(bit_stream, type_class, value):
+    bit_stream._buffer.set_size(0)
+    type_class(value).uper_encode(bit_stream)
+
+    return _get_stream_bits(bit_stream)
+
+
+def _get_stream_bits(bit_stream):
+    n_bits = len(bit_stream)
+
+    return int.from_bytes(bit_stream._buffer.bytes(), 'big') >> (-n_bits % WORD_SIZE), n_bits
+
+
+def _decode_call(bit_stream, position, type_class):
+    bit_stream._position = position
+    value = type_class()
+    value.uper_decode(bit_stream)
+
+    return _to_python(value), bit_stream._position
+
+
+def _get_octets(data, position, length):
+    start = position >> 3
+    shift = position & 7
+
+    if not shift:
+        return bytes(data[start:start + length])
+
+    value = int.from_bytes(data[start:start + length + 1], 'big') >> (WORD_SIZE - shift)
+
+    return (value & ((1 << (length * WORD_SIZE)) - 1)).to_bytes(length, 'big')
+
+
+def _to_python(value):
+    if isinstance(value, ASN1ComposedType):
+        return {
+            name: _to_python(getattr(value, '_' + name))
+            for name in value.__attributes__ if value.__attributes__[name]
+        }
+
+    if isinstance(value, ASN1ArrayOfType):
+        return [_to_python(element) for element in value._list]
+
+    if isinstance(value, OctetString):
+        return bytes(value._value)
+
+    if isinstance(value, ASN1StringWrappedType):
+        return str(value._value)
+
+    if isinstance(value, Enumerated):
+        return value._value.value
+
+    return value._value
+
+
+#############################
+#        Lazy views         #
+#############################
+
+
+def decode_lazy(type_class, data, position=0):
+    """
+        Decodes a uPER encoded SEQUENCE or SEQUENCE OF of type_class as a lazy view.
+
+        Only presence bits and length determinants are read up front. A field (or element) is
+        located by skipping the ones before it, jumping over fixed-size encodings at once, and
+        decoded to plain Python values on first access. SEQUENCE and SEQUENCE OF children are
+        returned as lazy views too. Other types are decoded right away.
+    """
+
+    return _materialize(CodecPlan.for_type(type_class).op, data, position)
+
+
+def _materialize(op, data, position):
+    if op[0] == 'seq':
+        return LazySequence(op, data, position)
+
+    if op[0] == 'seqof':
+        return LazySequenceOf(op, data, position)
+
+    return compile_codec(op[1]).decode(data, position)
+
+
+class _LazyView:
+    def __init__(self, op, data, position):
+        self._op = op
+        self._data = data
+        self._start = position
+        self._bit_stream = BitStream.from_buffer(data)
+        self._bit_stream._position = position
+        self._values = {}
+
+    def _skip(self, op, position):
+        self._bit_stream._position = position
+        _skip_op(op, self._bit_stream)
+
+        return self._bit_stream._position
+
+    def _get(self, key, op, position):
+        if key not in self._values:
+            self._values[key] = _materialize(op, self._data, position)
+
+        return self._values[key]
+
+    @property
+    def end(self):
+        """
+            Bit position right after the encoded value.
+        """
+
+        return self._skip(self._op, self._start)
+
+    def to_python(self):
+        return compile_codec(self._op[1]).decode(self._data, self._start)
+
+
+class LazySequence(_LazyView):
+    def __init__(self, op, data, position):
+        super().__init__(op, data, position)
+
+        _, _, children, optionals = op[:4]
+        present = {name: self._bit_stream.read_uint(1) for name in optionals}
+
+        self._fields = [(name, child_op) for name, child_op in children if present.get(name, True)]
+        self._indexes = {name: index for index, (name, _) in enumerate(self._fields)}
+        self._offsets = [self._bit_stream._position]
+
+    def _offset(self, index):
+        offsets = self._offsets
+
+        while len(offsets) <= index:
+            child_op = self._fields[len(offsets) - 1][1]
+            size = child_op[-1]
+            offsets.append(self._skip(child_op, offsets[-1]) if size is None else offsets[-1] + size)
+
+        return offsets[index]
+
+    @property
+    def end(self):
+        return self._offset(len(self._fields))
+
+    def __contains__(self, name):
+        return name in self._indexes
+
+    def __getitem__(self, name):
+        if name not in self._indexes:
+            raise KeyError(name)
+
+        index = self._indexes[name]
+
+        return self._get(name, self._fields[index][1], self._offset(index))
+
+    def __getattr__(self, name):
+        if name.startswith('_') or name not in self._indexes:
+            raise AttributeError("Attribute {} not present!".format(name))
+
+        return self[name]
+
+    def keys(self):
+        return [name for name, _ in self._fields]
+
+    def __repr__(self):
+        return '<{} view of {}>'.format(type(self).__name__, self._op[1].__name__)
+
+
+class LazySequenceOf(_LazyView):
+    def __init__(self, op, data, position):
+        super().__init__(op, data, position)
+
+        _, _, min_length, _, width, element_op = op[:6]
+
+        self._length = min_length + self._bit_stream.read_uint(width)
+        self._element_op = element_op
+        self._element_size = element_op[-1]
+        self._offsets = [self._bit_stream._position]
+
+    def _offset(self, index):
+        if self._element_size is not None:
+            return self._offsets[0] + index * self._element_size
+
+        while len(self._offsets) <= index:
+            self._offsets.append(self._skip(self._element_op, self._offsets[-1]))
+
+        return self._offsets[index]
+
+    @property
+    def end(self):
+        return self._offset(self._length)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._length
+
+        if not 0 <= index < self._length:
+            raise IndexError("Item {} doesn't exist!".format(index))
+
+        return self._get(index, self._element_op, self._offset(index))
+
+    def __iter__(self):
+        for index in range(self._length):
+            yield self[index]
+
+    def __repr__(self):
+        return '<{} view of {} elements of {}>'.format(type(self).__name__, self._length, self._op[1].__name__)
+
+
+#############################
+#         Indexing          #
+#############################
+
+
+def index_stream(type_class, path, fields=(), index_path=None):
+    """
+        Scans a file of concatenated uPER PDUs of type_class and writes a side-car index.
+
+        The index stores the start bit offset of every PDU and, for a SEQUENCE type, the bit
+        offsets of the top-level fields named in fields. PDUs are skipped with the codec plan
+        instead of decoded. The index is written to index_path (path + '.idx' by default) and
+        returned as a StreamIndex.
+    """
+
+    op = CodecPlan.for_type(type_class).op
+    fields = tuple(fields)
+
+    if fields:
+        names = [name for name, _ in op[2]] if op[0] == 'seq' else []
+        for name in fields:
+            if name not in names:
+                raise UnexpectedOption(type_class, name)
+
+    offsets = array.array('Q')
+
+    with BitStream().from_file(path, use_mmap=True) as bit_stream:
+        while not bit_stream.at_end():
+            start = bit_stream._position
+            offsets.append(start)
+
+            if fields:
+                offsets.extend(_skip_sequence_fields(op, bit_stream, fields))
+            else:
+                _skip_op(op, bit_stream)
+
+            if bit_stream._position == start:
+                bit_stream.skip(WORD_SIZE)  # empty encodings are replaced by a single zero octet (X.691 10.1.3)
+            else:
+                bit_stream._skip_to_next_byte()
+
+    header = dict(
+        module=type_class.__module__,
+        type=type_class.__qualname__,
+        fields=fields,
+        count=len(offsets) // (len(fields) + 1),
+        byteorder=sys.byteorder,
+    )
+
+    with open(index_path or path + INDEX_SUFFIX, 'wb') as file:
+        file.write(INDEX_MAGIC + json.dumps(header).encode() + b'\n')
+        offsets.tofile(file)
+
+    return StreamIndex(path, index_path)
+
+
+def _skip_sequence_fields(op, bit_stream, fields):
+    _, _, children, optionals = op[:4]
+    present = {name: bit_stream.read_uint(1) for name in optionals}
+    offsets = dict.fromkeys(fields, INDEX_ABSENT)
+
+    for name, child_op in children:
+        if present.get(name, True):
+            if name in offsets:
+                offsets[name] = bit_stream._position
+
+            _skip_op(child_op, bit_stream)
+
+    return [offsets[name] for name in fields]
+
+
+class StreamIndex:
+    """
+        Random access to the PDUs of a file indexed with index_stream.
+
+        Both the data file and the index are memory-mapped, so looking up PDU n or one of
+        its indexed fields is O(1) whatever the size of the archive.
+    """
+
+    def __init__(self, path, index_path=None):
+        self._bit_stream = BitStream().from_file(path, use_mmap=True)
+        self._data = self._bit_stream._buffer.bytes()
+
+        with open(index_path or path + INDEX_SUFFIX, 'rb') as file:
+            if file.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                raise ASN1Error("{} is not an index file".format(file.name))
+
+            header = json.loads(file.readline())
+            self._offsets = array.array('Q')
+            self._offsets.fromfile(file, header['count'] * (len(header['fields']) + 1))
+
+        if header['byteorder'] != sys.byteorder:
+            self._offsets.byteswap()
+
+        self.type_class = _import_type(header['module'], header['type'])
+        self.fields = tuple(header['fields'])
+        self._stride = len(self.fields) + 1
+
+    def __len__(self):
+        return len(self._offsets) // self._stride
+
+    def offset(self, n):
+        """
+            Start bit offset of PDU n.
+        """
+
+        return self._offsets[n * self._stride]
+
+    def field_offset(self, n, name):
+        """
+            Bit offset of the indexed field name of PDU n, or None if the field is absent.
+        """
+
+        offset = self._offsets[n * self._stride + 1 + self.fields.index(name)]
+
+        return None if offset == INDEX_ABSENT else offset
+
+    def decode(self, n):
+        self._bit_stream._position = self.offset(n)
+
+        return self.type_class().decode(self._bit_stream)
+
+    def decode_field(self, n, name):
+        offset = self.field_offset(n, name)
+        if offset is None:
+            raise AttributeError("Attribute {} not present!".format(name))
+
+        field_type = dict(CodecPlan.for_type(self.type_class).op[2])[name][1]
+
+        return compile_codec(field_type).decode(self._data, offset)
+
+    def view(self, n):
+        """
+            Lazy view of PDU n over a copy of its octets, so it stays valid after close().
+        """
+
+        start = self.offset(n) // WORD_SIZE
+        end = self.offset(n + 1) // WORD_SIZE if n + 1 < len(self) else len(self._data)
+
+        return decode_lazy(self.type_class, bytes(self._data[start:end]))
+
+    def close(self):
+        self._data = None
+        self._bit_stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+#############################
+#         Streaming         #
+#############################
+
+
+class ChunkedBitStream(BitStream):
+    """
+        Decoding stream pulling its data from a file object, pipe or socket.
+
+        The buffer is refilled in chunks only when a read needs more bits than are loaded,
+        and bytes already consumed are dropped on every refill, so memory stays bounded
+        by the chunk size (or the largest single read).
+    """
+
+    __slots__ = ('_read_chunk', '_chunk_size')
+
+    def __init__(self, source, chunk_size=STREAM_CHUNK_SIZE):
+        super().__init__()
+        self._read_chunk = source.recv if hasattr(source, 'recv') else source.read
+        self._chunk_size = chunk_size
+
+    def _fill(self, end):
+        consumed = self._position // WORD_SIZE
+        if consumed:
+            self._buffer = bitarray(self._buffer.bytes()[consumed:])
+            self._position -= consumed * WORD_SIZE
+            end -= consumed * WORD_SIZE
+
+        while len(self._buffer) < end:
+            missing = get_byte_length_from_bit_length(end - len(self._buffer))
+            chunk = self._read_chunk(max(missing, self._chunk_size))
+
+            if not chunk:
+                return False
+
+            self._buffer.append_bytes(chunk)
+
+        return True
+
+    def _require(self, n_bits):
+        if self._position + n_bits > len(self._buffer):
+            if not self._fill(self._position + n_bits):
+                raise EndOfStream(self._position + n_bits - len(self._buffer))
+
+    def read_uint(self, n_bits):
+        self._require(n_bits)
+
+        return super().read_uint(n_bits)
+
+    def read_octets(self, n_bytes):
+        self._require(n_bytes * WORD_SIZE)
+
+        return super().read_octets(n_bytes)
+
+    def skip(self, n_bits):
+        self._require(n_bits)
+
+        super().skip(n_bits)
+
+    def at_end(self):
+        return super().at_end() and not self._fill(self._position + 1)
+
+
+def iter_decode(type_class, source, encoding='uper', *args, chunk_size=STREAM_CHUNK_SIZE):
+    """
+        Lazily decodes concatenated PDUs of type_class.
+
+        source may be a BitStream or any file object, pipe or socket, which is read in chunks
+        of chunk_size bytes. Every PDU is expected to start on a byte boundary (X.691 pads
+        complete encodings to whole octets).
+    """
+
+    if isinstance(source, BitStream):
+        bit_stream = source
+    else:
+        bit_stream = ChunkedBitStream(source, chunk_size)
+
+    while not bit_stream.at_end():
+        value = type_class()
+        _decode_pdu(value, bit_stream, encoding, *args)
+
+        yield value
+
+
+def _decode_pdu(value, bit_stream, encoding, *args):
+    start = bit_stream._position
+    value.decode(bit_stream, encoding, *args)
+
+    if bit_stream._position == start:
+        bit_stream._position += WORD_SIZE  # empty encodings are replaced by a single zero octet (X.691 10.1.3)
+    else:
+        bit_stream._skip_to_next_byte()
+
+
+class AsyncDecoder:
+    """
+        Asynchronous iterator over PDUs read from an asyncio.StreamReader.
+
+        With length_prefix every PDU is preceded by its length in octets, stored on
+        length_prefix bytes, and exactly that many bytes are read. Otherwise whole chunks of
+        at least STREAM_CHUNK_SIZE bytes (or the REQUIRED_BYTES_FOR_ENCODING of type_class,
+        if larger) are requested, and bytes following a PDU are kept for the next one. When
+        the data at hand ends in the middle of a PDU, decoding is retried only once enough
+        bytes arrived to cover what the failed attempt was missing. Types much larger than a
+        chunk still pay one attempt per chunk, so length_prefix framing suits them better.
+
+        Data is read only when the next PDU is requested, so a slow consumer lets the
+        reader buffer fill up and pause the transport (backpressure). PDUs of at least
+        executor_threshold bytes are decoded in the executor to keep the loop responsive.
+        Without length_prefix the size of a PDU is known only as far as the failed attempts
+        revealed it, and that lower bound is what the threshold is compared with.
+
+        PDUs are decoded in place from the buffered bytes. Consumed bytes are dropped from
+        the buffer only when the next chunk is appended.
+    """
+
+    def __init__(self, type_class, reader, encoding='uper', *args, length_prefix=0, byteorder='big',
+                 executor=None, executor_threshold=EXECUTOR_THRESHOLD):
+        self._type_class = type_class
+        self._reader = reader
+        self._encoding = encoding
+        self._args = args
+        self._length_prefix = length_prefix
+        self._byteorder = byteorder
+        self._executor = executor
+        self._executor_threshold = executor_threshold
+        self._read_size = max(getattr(type_class, 'REQUIRED_BYTES_FOR_ENCODING', 0), STREAM_CHUNK_SIZE)
+        self._buffer = bytearray()
+        self._offset = 0
+        self._view = None
+        self._bit_stream = ChunkedBitStream(io.BytesIO())  # nothing more to pull, a short read raises EndOfStream
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._length_prefix:
+            return await self._next_prefixed()
+
+        return await self._next_unframed()
+
+    async def _next_prefixed(self):
+        try:
+            header = await self._reader.readexactly(self._length_prefix)
+        except asyncio.IncompleteReadError as error:
+            if error.partial:
+                raise EndOfStream((self._length_prefix - len(error.partial)) * WORD_SIZE)
+
+            raise StopAsyncIteration
+
+        length = int.from_bytes(header, self._byteorder)
+
+        try:
+            data = await self._reader.readexactly(length)
+        except asyncio.IncompleteReadError as error:
+            raise EndOfStream((length - len(error.partial)) * WORD_SIZE)
+
+        self._bit_stream._buffer = bitarray.frombuffer(data)
+        self._bit_stream._position = 0
+
+        return await self._decode(self._bit_stream, length)
+
+    async def _next_unframed(self):
+        required = 1
+
+        while True:
+            available = len(self._buffer) - self._offset
+
+            if available >= required:
+                if self._view is None:
+                    self._view = bitarray.frombuffer(self._buffer)
+
+                self._bit_stream._buffer = self._view
+                self._bit_stream._position = self._offset * WORD_SIZE
+
+                try:
+                    value = await self._decode(self._bit_stream, required)
+                except EndOfStream as error:
+                    required = available + get_byte_length_from_bit_length(max(error.n_bits, 1))
+                else:
+                    self._offset = self._bit_stream._position // WORD_SIZE
+                    return value
+
+            chunk = await self._reader.read(self._read_size)
+
+            if not chunk:
+                if available:
+                    raise EndOfStream((required - available) * WORD_SIZE)
+
+                raise StopAsyncIteration
+
+            if self._view is not None:
+                self._view.release()  # a bytearray cannot be resized while it is exported
+                self._view = None
+
+            del self._buffer[:self._offset]  # consumed PDUs are dropped only when more data comes in
+            self._offset = 0
+            self._buffer += chunk
+
+    async def _decode(self, bit_stream, size):
+        if size >= self._executor_threshold:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._decode_data, bit_stream)
+
+        return self._decode_data(bit_stream)
+
+    def _decode_data(self, bit_stream):
+        value = self._type_class()
+        _decode_pdu(value, bit_stream, self._encoding, *self._args)
+
+        return value
+
+
+#############################
+#     Batch processing      #
+#############################
+
+
+def batch_decode(type_class, pdus, encoding='uper', *args, workers=None, chunk_size=BATCH_CHUNK_SIZE):
+    """
+        Decodes independent PDUs of type_class in a pool of worker processes.
+
+        pdus is an iterable of bytes-like objects, one complete encoding each. Every chunk
+        of chunk_size PDUs is sent to a worker as a single bytes object with the PDU lengths,
+        instead of as pickled objects. type_class is imported by its qualified name in the
+        workers, so it must be defined at module level.
+
+        Decoded values are yielded in input order.
+    """
+
+    chunks = ((b''.join(chunk), [len(pdu) for pdu in chunk]) for chunk in _split(pdus, chunk_size))
+
+    for values in _map_chunks(_batch_decode_chunk, type_class, encoding, args, chunks, workers):
+        yield from values
+
+
+def batch_encode(type_class, values, encoding='uper', *args, workers=None, chunk_size=BATCH_CHUNK_SIZE):
+    """
+        Encodes independent values of type_class in a pool of worker processes.
+
+        values may be type_class instances or anything accepted by its constructor. Every
+        encoding is padded to whole octets and yielded as bytes, in input order.
+    """
+
+    chunks = ((chunk,) for chunk in _split(values, chunk_size))
+
+    for blob, lengths in _map_chunks(_batch_encode_chunk, type_class, encoding, args, chunks, workers):
+        yield from _unpack(blob, lengths)
+
+
+def _map_chunks(function, type_class, encoding, args, chunks, workers):
+    type_name = (type_class.__module__, type_class.__qualname__)
+    workers = workers or os.cpu_count() or 1
+    executor = concurrent.futures.ProcessPoolExecutor(workers)
+    pending = collections.deque()
+
+    try:
+        for chunk in chunks:
+            pending.append(executor.submit(function, type_name, encoding, args, *chunk))
+
+            if len(pending) > 2 * workers:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def _batch_decode_chunk(type_name, encoding, args, blob, lengths):
+    type_class = _import_type(*type_name)
+
+    return [
+        type_class().decode(BitStream.from_buffer(pdu), encoding, *args)
+        for pdu in _unpack(memoryview(blob), lengths)
+    ]
+
+
+def _batch_encode_chunk(type_name, encoding, args, values):
+    type_class = _import_type(*type_name)
+    blob = bytearray()
+    lengths = []
+
+    for value in values:
+        if not isinstance(value, type_class):
+            value = type_class(value)
+
+        bit_stream = BitStream.for_type(type_class)
+        value.encode(bit_stream, encoding, *args)
+        data = bit_stream._buffer.bytes() or b'\x00'  # empty encodings are replaced by a single zero octet
+
+        blob += data
+        lengths.append(len(data))
+
+    return bytes(blob), lengths
+
+
+def _import_type(module_name, qualname):
+    type_class = importlib.import_module(module_name)
+
+    for name in qualname.split('.'):
+        type_class = getattr(type_class, name)
+
+    return type_class
+
+
+def _split(iterable, size):
+    iterator = iter(iterable)
+
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+
+        if not chunk:
+            return
+
+        yield chunk
+
+
+def _unpack(blob, lengths):
+    offset = 0
+
+    for length in lengths:
+        yield blob[offset:offset + length]
+        offset += length
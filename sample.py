@@ -39,6 +39,8 @@ class MyInt(asn1.PosInteger):
     def check_constraints(self, value):
         return value <= 100
 
+    __value_range__ = (0, 100)
+
     REQUIRED_BYTES_FOR_ENCODING = 1
     REQUIRED_BITS_FOR_ENCODING = 7
 
@@ -90,6 +92,8 @@ class MyIntArr(asn1.SequenceOf[int]):
     def init_value(self):
         return 10  # init length
 
+    __size_range__ = (10, 10)
+
     REQUIRED_BYTES_FOR_ENCODING = 90
     REQUIRED_BITS_FOR_ENCODING = 720
 
@@ -115,6 +119,8 @@ class MyIntArr(asn1.SequenceOf[int]):
         def init_value(self):
             return 0
 
+        __value_range__ = (None, None)
+
         REQUIRED_BYTES_FOR_ENCODING = 9
         REQUIRED_BITS_FOR_ENCODING = 72
 
@@ -144,34 +150,20 @@ class MyStr(asn1.IA5String):
     def check_constraints(self, value):
         return (1 <= len(value) and len(value) <= 10) and self._check_alphabet(value)
 
+    __size_range__ = (1, 10)
+    __alphabet__ = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcde'
+    __charset_codec__ = asn1.CharsetCodec(__alphabet__, 5)
+
     REQUIRED_BYTES_FOR_ENCODING = 7
     REQUIRED_BITS_FOR_ENCODING = 54
 
     def uper_encode(self, bit_stream):
         bit_stream.encode_constraint_number(len(self._value), 1, 10)
-
-        for i1 in range(len(self._value)):
-            allowed_charset = ['\x41', '\x42', '\x43', '\x44', '\x45', '\x46', '\x47', '\x48',
-                               '\x49', '\x4A', '\x4B', '\x4C', '\x4D', '\x4E', '\x4F', '\x50',
-                               '\x51', '\x52', '\x53', '\x54', '\x55', '\x56', '\x57', '\x58',
-                               '\x59', '\x5A', '\x61', '\x62', '\x63', '\x64', '\x65']
-            index = allowed_charset.index(self._value[i1])
-            bit_stream.encode_constraint_number(index, 0, 31)
+        self.__charset_codec__.encode(bit_stream, self._value)
 
     def uper_decode(self, bit_stream):
-        value_i1 = ''
         length = bit_stream.decode_constraint_number(1, 10)
-
-        for i1 in range(length):
-            allowed_charset = ['\x41', '\x42', '\x43', '\x44', '\x45', '\x46', '\x47', '\x48',
-                               '\x49', '\x4A', '\x4B', '\x4C', '\x4D', '\x4E', '\x4F', '\x50',
-                               '\x51', '\x52', '\x53', '\x54', '\x55', '\x56', '\x57', '\x58',
-                               '\x59', '\x5A', '\x61', '\x62', '\x63', '\x64', '\x65']
-            index = bit_stream.decode_constraint_number(0, 31)
-            char = allowed_charset[index]
-            value_i1 += char
-
-        value = value_i1
+        value = self.__charset_codec__.decode(bit_stream, length, type(self))
 
         self.set(value)
 
@@ -187,27 +179,18 @@ class MyNumStr(asn1.NumericString):
     def check_constraints(self, value):
         return len(value) == 3
 
+    __size_range__ = (3, 3)
+    __alphabet__ = ' 0123456789'
+    __charset_codec__ = asn1.CharsetCodec(__alphabet__, 4)
+
     REQUIRED_BYTES_FOR_ENCODING = 2
     REQUIRED_BITS_FOR_ENCODING = 12
 
     def uper_encode(self, bit_stream):
-        for i1 in range(3):
-            allowed_charset = ['\x20', '\x30', '\x31', '\x32', '\x33', '\x34', '\x35', '\x36',
-                               '\x37', '\x38', '\x39']
-            index = allowed_charset.index(self._value[i1])
-            bit_stream.encode_constraint_number(index, 0, 11)
+        self.__charset_codec__.encode(bit_stream, self._value)
 
     def uper_decode(self, bit_stream):
-        value_i1 = ''
-
-        for i1 in range(3):
-            allowed_charset = ['\x20', '\x30', '\x31', '\x32', '\x33', '\x34', '\x35', '\x36',
-                               '\x37', '\x38', '\x39']
-            index = bit_stream.decode_constraint_number(0, 11)
-            char = allowed_charset[index]
-            value_i1 += char
-
-        value = value_i1
+        value = self.__charset_codec__.decode(bit_stream, 3, type(self))
 
         self.set(value)
 
@@ -223,6 +206,8 @@ class MyBit(asn1.BitString):
     def check_constraints(self, value):
         return len(value) == 16
 
+    __size_range__ = (16, 16)
+
     REQUIRED_BYTES_FOR_ENCODING = 16
     REQUIRED_BITS_FOR_ENCODING = 128
 
@@ -246,24 +231,19 @@ class MyOct(asn1.OctetString):
     def check_constraints(self, value):
         return (3 <= len(value) and len(value) <= 8)
 
+    __size_range__ = (3, 8)
+
     REQUIRED_BYTES_FOR_ENCODING = 9
     REQUIRED_BITS_FOR_ENCODING = 67
 
     def uper_encode(self, bit_stream):
         bit_stream.encode_constraint_number(len(self._value), 3, 8)
 
-        for i1 in range(len(self._value)):
-            bit_stream.append_byte(self._value[i1])
+        bit_stream.append_octets(self._value)
 
     def uper_decode(self, bit_stream):
-        value_i1 = bytearray()
         length = bit_stream.decode_constraint_number(3, 8)
-
-        for i1 in range(length):
-            byte = bit_stream.read_byte()
-            value_i1.append(byte)
-
-        value = value_i1
+        value = bit_stream.read_octets(length)
 
         self.set(value)
 
@@ -308,33 +288,6 @@ class MyEnum(asn1.Enumerated):
     REQUIRED_BYTES_FOR_ENCODING = 1
     REQUIRED_BITS_FOR_ENCODING = 2
 
-    def uper_encode(self, bit_stream):
-        if self._value == self.Value.alpha:
-            bit_stream.encode_constraint_number(0, 0, 2)
-
-        elif self._value == self.Value.beta:
-            bit_stream.encode_constraint_number(1, 0, 2)
-
-        elif self._value == self.Value.gamma:
-            bit_stream.encode_constraint_number(2, 0, 2)
-
-    def uper_decode(self, bit_stream):
-        enum_index = bit_stream.decode_constraint_number(0, 2)
-
-        if enum_index == 0:
-            value = self.Value.alpha
-
-        elif enum_index == 1:
-            value = self.Value.beta
-
-        elif enum_index == 2:
-            value = self.Value.gamma
-
-        else:
-            raise asn1.UnexpectedOptionIndex(type(self), enum_index)
-
-        self.set(value)
-
 
 class MyStruct(asn1.Sequence):
     """Derived from Sequence"""
@@ -429,6 +382,8 @@ class MyStruct(asn1.Sequence):
         def check_constraints(self, value):
             return (1 <= value and value <= 10)
 
+        __value_range__ = (1, 10)
+
         REQUIRED_BYTES_FOR_ENCODING = 1
         REQUIRED_BITS_FOR_ENCODING = 4
 
@@ -547,12 +502,15 @@ class MyChoice(asn1.Choice):
 
         if child_index == 0:
             self._alpha_0.uper_decode(bit_stream)
+            self.set_attribute_exists('alpha_0', True)
 
         elif child_index == 1:
             self._beta.uper_decode(bit_stream)
+            self.set_attribute_exists('beta', True)
 
         elif child_index == 2:
             self._octStr.uper_decode(bit_stream)
+            self.set_attribute_exists('octStr', True)
 
         else:
             raise asn1.UnexpectedOptionIndex(type(self), child_index)
@@ -578,6 +536,8 @@ class MyChoice(asn1.Choice):
         def init_value(self):
             return 0
 
+        __value_range__ = (None, None)
+
         REQUIRED_BYTES_FOR_ENCODING = 9
         REQUIRED_BITS_FOR_ENCODING = 72
 
@@ -600,21 +560,16 @@ class MyChoice(asn1.Choice):
         def check_constraints(self, value):
             return len(value) == 4
 
+        __size_range__ = (4, 4)
+
         REQUIRED_BYTES_FOR_ENCODING = 4
         REQUIRED_BITS_FOR_ENCODING = 32
 
         def uper_encode(self, bit_stream):
-            for i1 in range(4):
-                bit_stream.append_byte(self._value[i1])
+            bit_stream.append_octets(self._value)
 
         def uper_decode(self, bit_stream):
-            value_i1 = bytearray()
-
-            for i1 in range(4):
-                byte = bit_stream.read_byte()
-                value_i1.append(byte)
-
-            value = value_i1
+            value = bit_stream.read_octets(4)
 
             self.set(value)
 
@@ -759,6 +714,8 @@ class MySqOf(asn1.SequenceOf['MySqOf.ElementType']):
             def check_constraints(self, value):
                 return (1 <= value and value <= 10)
 
+            __value_range__ = (1, 10)
+
             REQUIRED_BYTES_FOR_ENCODING = 1
             REQUIRED_BITS_FOR_ENCODING = 4
 
@@ -793,6 +750,8 @@ class MySqOf(asn1.SequenceOf['MySqOf.ElementType']):
             def init_value(self):
                 return 0
 
+            __value_range__ = (None, None)
+
             REQUIRED_BYTES_FOR_ENCODING = 9
             REQUIRED_BITS_FOR_ENCODING = 72
 
@@ -822,33 +781,6 @@ class TypeEnumerated(asn1.Enumerated):
     REQUIRED_BYTES_FOR_ENCODING = 1
     REQUIRED_BITS_FOR_ENCODING = 2
 
-    def uper_encode(self, bit_stream):
-        if self._value == self.Value.red:
-            bit_stream.encode_constraint_number(0, 0, 2)
-
-        elif self._value == self.Value.green:
-            bit_stream.encode_constraint_number(1, 0, 2)
-
-        elif self._value == self.Value.blue:
-            bit_stream.encode_constraint_number(2, 0, 2)
-
-    def uper_decode(self, bit_stream):
-        enum_index = bit_stream.decode_constraint_number(0, 2)
-
-        if enum_index == 0:
-            value = self.Value.red
-
-        elif enum_index == 1:
-            value = self.Value.green
-
-        elif enum_index == 2:
-            value = self.Value.blue
-
-        else:
-            raise asn1.UnexpectedOptionIndex(type(self), enum_index)
-
-        self.set(value)
-
 
 class My2ndEnumerated(TypeEnumerated):
     """Ref from TypeEnumerated"""
@@ -1186,6 +1118,8 @@ class AComplexMessage(asn1.Sequence):
         def check_constraints(self, value):
             return value <= 10
 
+        __value_range__ = (0, 10)
+
         REQUIRED_BYTES_FOR_ENCODING = 1
         REQUIRED_BITS_FOR_ENCODING = 4
 
@@ -1208,6 +1142,8 @@ class AComplexMessage(asn1.Sequence):
         def check_constraints(self, value):
             return (-10 <= value and value <= 10)
 
+        __value_range__ = (-10, 10)
+
         REQUIRED_BYTES_FOR_ENCODING = 1
         REQUIRED_BITS_FOR_ENCODING = 5
 
@@ -1230,6 +1166,8 @@ class AComplexMessage(asn1.Sequence):
         def check_constraints(self, value):
             return value <= 100 and (10 <= value and value <= 12)
 
+        __value_range__ = (10, 12)
+
         REQUIRED_BYTES_FOR_ENCODING = 1
         REQUIRED_BITS_FOR_ENCODING = 2
 
@@ -1278,6 +1216,8 @@ class AComplexMessage(asn1.Sequence):
         def check_constraints(self, value):
             return len(value) == 10
 
+        __size_range__ = (10, 10)
+
         REQUIRED_BYTES_FOR_ENCODING = 3
         REQUIRED_BITS_FOR_ENCODING = 20
 
@@ -1308,6 +1248,8 @@ class AComplexMessage(asn1.Sequence):
             def check_constraints(self, value):
                 return value <= 3
 
+            __value_range__ = (0, 3)
+
             REQUIRED_BYTES_FOR_ENCODING = 1
             REQUIRED_BITS_FOR_ENCODING = 2
 
@@ -1330,6 +1272,8 @@ class AComplexMessage(asn1.Sequence):
         def check_constraints(self, value):
             return len(value) == 15
 
+        __size_range__ = (15, 15)
+
         REQUIRED_BYTES_FOR_ENCODING = 195
         REQUIRED_BITS_FOR_ENCODING = 1560
 
@@ -1382,6 +1326,8 @@ class AComplexMessage(asn1.Sequence):
         def check_constraints(self, value):
             return len(value) == 20
 
+        __size_range__ = (20, 20)
+
         REQUIRED_BYTES_FOR_ENCODING = 210
         REQUIRED_BITS_FOR_ENCODING = 1680
 
@@ -1412,24 +1358,19 @@ class AComplexMessage(asn1.Sequence):
             def check_constraints(self, value):
                 return (1 <= len(value) and len(value) <= 10)
 
+            __size_range__ = (1, 10)
+
             REQUIRED_BYTES_FOR_ENCODING = 11
             REQUIRED_BITS_FOR_ENCODING = 84
 
             def uper_encode(self, bit_stream):
                 bit_stream.encode_constraint_number(len(self._value), 1, 10)
 
-                for i2 in range(len(self._value)):
-                    bit_stream.append_byte(self._value[i2])
+                bit_stream.append_octets(self._value)
 
             def uper_decode(self, bit_stream):
-                value_i2 = bytearray()
                 length = bit_stream.decode_constraint_number(1, 10)
-
-                for i2 in range(length):
-                    byte = bit_stream.read_byte()
-                    value_i2.append(byte)
-
-                value = value_i2
+                value = bit_stream.read_octets(length)
 
                 self.set(value)
 
@@ -1439,6 +1380,8 @@ class AComplexMessage(asn1.Sequence):
         def init_value(self):
             return 12  # init length
 
+        __size_range__ = (12, 12)
+
         REQUIRED_BYTES_FOR_ENCODING = 3
         REQUIRED_BITS_FOR_ENCODING = 24
 
@@ -1519,27 +1462,6 @@ class AComplexMessage(asn1.Sequence):
         REQUIRED_BYTES_FOR_ENCODING = 1
         REQUIRED_BITS_FOR_ENCODING = 1
 
-        def uper_encode(self, bit_stream):
-            if self._value == self.Value.truism:
-                bit_stream.encode_constraint_number(0, 0, 1)
-
-            elif self._value == self.Value.falsism:
-                bit_stream.encode_constraint_number(1, 0, 1)
-
-        def uper_decode(self, bit_stream):
-            enum_index = bit_stream.decode_constraint_number(0, 1)
-
-            if enum_index == 0:
-                value = self.Value.truism
-
-            elif enum_index == 1:
-                value = self.Value.falsism
-
-            else:
-                raise asn1.UnexpectedOptionIndex(type(self), enum_index)
-
-            self.set(value)
-
     class labelType(asn1.OctetString):
         """Derived from OctetString"""
 
@@ -1551,24 +1473,19 @@ class AComplexMessage(asn1.Sequence):
         def check_constraints(self, value):
             return (10 <= len(value) and len(value) <= 40)
 
+        __size_range__ = (10, 40)
+
         REQUIRED_BYTES_FOR_ENCODING = 41
         REQUIRED_BITS_FOR_ENCODING = 325
 
         def uper_encode(self, bit_stream):
             bit_stream.encode_constraint_number(len(self._value), 10, 40)
 
-            for i1 in range(len(self._value)):
-                bit_stream.append_byte(self._value[i1])
+            bit_stream.append_octets(self._value)
 
         def uper_decode(self, bit_stream):
-            value_i1 = bytearray()
             length = bit_stream.decode_constraint_number(10, 40)
-
-            for i1 in range(length):
-                byte = bit_stream.read_byte()
-                value_i1.append(byte)
-
-            value = value_i1
+            value = bit_stream.read_octets(length)
 
             self.set(value)
 
@@ -1629,15 +1546,16 @@ vMyChoice = MyChoice(dict(
     c=True
 )
 ))
-b = asn1.BitStream()
 
+if __name__ == '__main__':
+    b = asn1.BitStream()
 
-vMyChoice.encode(b, 'uper')
-print(vMyChoice)
-b2 = asn1.BitStream(b)
-print(b2)
+    vMyChoice.encode(b, 'uper')
+    print(vMyChoice)
+    b2 = asn1.BitStream(b)
+    print(b2)
 
-y = MyChoice()
-y.decode(b2, 'uper')
+    y = MyChoice()
+    y.decode(b2, 'uper')
 
-print(y)
\ No newline at end of file
+    print(y)
@@ -0,0 +1,45 @@
+import pickle
+from unittest import TestCase
+
+import asn1
+import sample
+
+
+class BatchTest(TestCase):
+    def test_batch_encode(self):
+        values = [sample.MyInt(value) for value in range(0, 101, 10)]
+        expected = []
+
+        for value in values:
+            bit_stream = asn1.BitStream()
+            value.encode(bit_stream)
+            expected.append(bytes(bit_stream._buffer.bytes()))
+
+        self.assertEqual(expected, list(asn1.batch_encode(sample.MyInt, values, workers=2, chunk_size=3)))
+
+    def test_batch_encode_plain_values(self):
+        encoded = list(asn1.batch_encode(sample.MyInt, [0, 88, 100], workers=2))
+
+        self.assertEqual([b'\x00', b'\xb0', b'\xc8'], encoded)
+
+    def test_batch_decode(self):
+        values = [sample.MyOct(bytes([i]) * (3 + i % 6)) for i in range(50)]
+        encoded = asn1.batch_encode(sample.MyOct, values, workers=2, chunk_size=7)
+        decoded = list(asn1.batch_decode(sample.MyOct, encoded, workers=2, chunk_size=7))
+
+        self.assertEqual(values, decoded)
+
+    def test_batch_decode_composed(self):
+        encoded = list(asn1.batch_encode(sample.MyChoice, [sample.vMyChoice] * 5, workers=2, chunk_size=2))
+        decoded = list(asn1.batch_decode(sample.MyChoice, encoded, workers=2, chunk_size=2))
+
+        self.assertEqual([sample.vMyChoice.vars()] * 5, [value.vars() for value in decoded])
+
+    def test_batch_empty(self):
+        self.assertEqual([], list(asn1.batch_decode(sample.MyInt, [], workers=1)))
+
+    def test_pickle_string_wrapped_type(self):
+        value = pickle.loads(pickle.dumps(sample.vMyOct))
+        value.get().append(0x9a)
+
+        self.assertEqual(b'\x12\x34\x56\x78\x9a', bytes(value.get()))
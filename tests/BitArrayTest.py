@@ -0,0 +1,111 @@
+from unittest import TestCase
+
+import asn1
+import sample
+from asn1 import bitarray
+
+
+class BitArrayTest(TestCase):
+    def setUp(self):
+        self.a = bitarray.fromhex('a5')
+
+    def test_iter(self):
+        self.assertEqual([1, 0, 1, 0, 0, 1, 0, 1], list(self.a))
+        self.assertEqual('10100101', str(self.a))
+
+    def test_iter_is_reentrant(self):
+        pairs = [(i, j) for i in self.a for j in self.a]
+
+        self.assertEqual(64, len(pairs))
+        self.assertEqual(16, pairs.count((1, 1)))
+
+    def test_slots(self):
+        self.assertFalse(hasattr(self.a, '__dict__'))
+        self.assertFalse(hasattr(asn1.BitStream(), '__dict__'))
+        self.assertRaises(AttributeError, getattr, self.a, 'missing')
+
+    def test_bit_string_values_share_wrapper(self):
+        first = sample.MyBit(b'\xff\xac')
+        second = sample.MyBit(b'\x00\x01')
+
+        self.assertIs(type(first.get()), type(second.get()))
+        self.assertIsInstance(first.get(), bitarray)
+
+    def test_bit_string_mutation_is_checked(self):
+        value = sample.MyBit(b'\xff\xac')
+
+        self.assertRaises(asn1.ConstraintException, value.get().append, 1)
+
+    def test_bitwise(self):
+        other = bitarray('11110000')
+
+        self.assertEqual('10100000', str(self.a & other))
+        self.assertEqual('11110101', str(self.a | other))
+        self.assertEqual('01010101', str(self.a ^ other))
+        self.assertEqual('01011010', str(~self.a))
+        self.assertEqual('110', str(~bitarray('001')))
+        self.assertRaises(ValueError, self.a.__and__, bitarray('1'))
+
+    def test_count(self):
+        self.assertEqual(4, self.a.count())
+        self.assertEqual(4, self.a.count(0))
+        self.assertEqual(0, bitarray().count())
+
+    def test_find(self):
+        self.assertEqual(2, self.a.find('1001'))
+        self.assertEqual(5, self.a.find(bitarray('101'), 1))
+        self.assertEqual(-1, self.a.find([1, 1]))
+
+    def test_slice(self):
+        a = bitarray.fromhex('a5c3')
+
+        self.assertEqual('1011100', str(a[5:12]))
+        self.assertEqual('0011', str(a[-4:]))
+        self.assertEqual('1100', str(a[0:8:2]))
+        self.assertEqual('', str(a[4:2]))
+
+    def test_tobytes_frombytes(self):
+        a = bitarray.frombytes(b'\xab\xc0', padding=4)
+
+        self.assertEqual(12, len(a))
+        self.assertEqual(b'\xab\xc0', a.tobytes())
+        self.assertEqual(b'\xab\xcf', a.tobytes(pad=1))
+        self.assertRaises(ValueError, bitarray.frombytes, b'\x00', 8)
+
+    def test_insert(self):
+        self.a.insert(0, 0)
+        self.a.insert(3, 1)
+        self.a.insert(-1, 1)
+
+        self.assertEqual('01011001011', str(self.a))
+
+    def test_delete(self):
+        del self.a[0]
+        del self.a[3]
+        del self.a[-1]
+
+        self.assertEqual('01010', str(self.a))
+
+    def test_pop_remove(self):
+        self.assertEqual(1, self.a.pop(0))
+        self.assertEqual(1, self.a.pop())
+        self.assertEqual('01010', str(self.a.remove(2)))
+
+    def test_reverse(self):
+        a = bitarray('1100101101')
+
+        self.assertEqual('1011010011', str(a.reverse()))
+        self.assertEqual('1100101101', str(a))
+        self.assertEqual('', str(bitarray().reverse()))
+
+    def test_edit_long(self):
+        bits = [(i * 7) % 3 % 2 for i in range(10000)]
+        a = bitarray(bits)
+
+        del a[17]
+        del bits[17]
+        a.insert(4000, 1)
+        bits.insert(4000, 1)
+
+        self.assertEqual(''.join(map(str, bits)), str(a))
+        self.assertEqual(''.join(map(str, reversed(bits))), str(a.reverse()))
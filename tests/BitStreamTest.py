@@ -1,3 +1,7 @@
+import math
+import os
+import tempfile
+from array import array
 from unittest import TestCase
 
 import asn1
@@ -49,6 +53,233 @@ class BitStreamTest(TestCase):
         self.b2 = BitStream(self.b)
         self.assertTrue(self.b2.read_bit_pattern(bytearray([0b10100101, 0b11001100, 0b11101111]), 10))
 
+    def test_append_bits_int(self):
+        self.b.append_bits(0b101, 3)
+        self.b.append_bits(0x1ffff, 17)
+
+        self.b2 = BitStream(self.b)
+        self.assertEqual(0b10100000, self.b2.read_partial_byte(3))
+        self.assertEqual(bytearray([0xff, 0xff, 0x80]), self.b2.read_bits(17))
+        self.assertEqual(20, self.b._current_byte * 8 + self.b._current_bit)
+
+    def test_append_uint_unaligned(self):
+        self.b.append_bit_one()
+        self.b.append_uint(0xdeadbeefcafe, 48)
+        self.b.append_uint(-1, 7)
+
+        self.assertEqual('1' + bin(0xdeadbeefcafe)[2:] + '1111111', str(self.b))
+
+    def test_append_bits_zero_one(self):
+        self.b.append_bits_one(5)
+        self.b.append_bits_zero(6)
+        self.b.append_bits_one(0)
+
+        self.assertEqual('11111000000', str(self.b))
+
+    def test_read_uint_unaligned(self):
+        self.b.append_bits_zero(3)
+        self.b.append_uint(0xdeadbeefcafe, 48)
+
+        self.b2 = BitStream(self.b)
+        self.assertEqual(0, self.b2.read_uint(3))
+        self.assertEqual(0xdeadbeefcafe, self.b2.read_uint(48))
+
+    def test_read_int(self):
+        self.b.append_uint(-5, 11)
+        self.b.append_uint(5, 11)
+
+        self.b2 = BitStream(self.b)
+        self.assertEqual(-5, self.b2.read_int(11))
+        self.assertEqual(5, self.b2.read_int(11))
+
+    def test_read_uint_past_end(self):
+        self.b.append_uint(3, 5)
+
+        self.b2 = BitStream(self.b)
+        self.assertRaises(AttributeError, self.b2.read_uint, 6)
+
+    def test_append_read_octets_aligned(self):
+        self.b.append_octets(b'\x12\x34\x56')
+        self.b.append_octets(bytearray(b'\x78'))
+
+        self.b2 = BitStream(self.b)
+        self.assertEqual(bytearray(b'\x12\x34'), self.b2.read_octets(2))
+        self.assertEqual(bytearray(b'\x56\x78'), self.b2.read_octets(2))
+
+    def test_append_read_octets_unaligned(self):
+        self.b.append_bits_one(3)
+        self.b.append_octets(b'\x12\x34\x56')
+
+        self.b2 = BitStream(self.b)
+        self.assertEqual(0b111, self.b2.read_uint(3))
+        self.assertEqual(bytearray(b'\x12\x34\x56'), self.b2.read_octets(3))
+        self.assertEqual(27, self.b._current_byte * 8 + self.b._current_bit)
+
+    def test_read_octets_past_end(self):
+        self.b.append_octets(b'\x12\x34')
+
+        self.b2 = BitStream(self.b)
+        self.assertRaises(AttributeError, self.b2.read_octets, 3)
+
+    def test_from_buffer_bytes(self):
+        self.b = BitStream.from_buffer(b'\xa5\x12\x34')
+
+        self.assertEqual(0b101, self.b.read_uint(3))
+        self.assertEqual(0b00101, self.b.read_uint(5))
+        self.assertEqual(bytearray(b'\x12\x34'), self.b.read_octets(2))
+
+    def test_from_buffer_does_not_copy(self):
+        source = bytearray(b'\x00\x00')
+        self.b = BitStream.from_buffer(memoryview(source)[1:])
+        source[1] = 0xfe
+
+        self.assertEqual(0xfe, self.b.read_byte())
+
+    def test_from_buffer_array(self):
+        self.b = BitStream.from_buffer(array('B', [1, 2, 3]))
+
+        self.assertEqual(0x010203, self.b.read_uint(24))
+
+    def test_from_buffer_read_only(self):
+        self.b = BitStream.from_buffer(bytearray(b'\x01'))
+
+        self.assertRaises(TypeError, self.b.append_byte, 1)
+
+    def test_from_buffer_shared(self):
+        self.b = BitStream.from_buffer(b'\x01\x02')
+        self.b.read_byte()
+        self.b2 = BitStream(self.b)
+
+        self.assertIs(self.b._buffer, self.b2._buffer)
+        self.assertEqual(1, self.b2.read_byte())
+
+    def _write_temp_file(self, data):
+        file_descriptor, filename = tempfile.mkstemp()
+        with os.fdopen(file_descriptor, 'wb') as file:
+            file.write(data)
+
+        self.addCleanup(os.remove, filename)
+
+        return filename
+
+    def test_from_file(self):
+        filename = self._write_temp_file(b'\x12\x34')
+
+        self.b.from_file(filename)
+        self.assertEqual(0x1234, self.b.read_uint(16))
+
+        self.b.append_uint(0x5, 4)
+        self.assertEqual(20, len(self.b))
+
+    def test_from_file_mmap(self):
+        filename = self._write_temp_file(b'\x12\x34\x56')
+
+        with BitStream().from_file(filename, use_mmap=True) as self.b:
+            self.assertTrue(self.b._buffer.readonly)
+            self.assertEqual(0x1, self.b.read_uint(4))
+            self.assertEqual(bytearray(b'\x23\x45'), self.b.read_octets(2))
+
+        self.assertIsNone(self.b._mmap)
+        self.assertEqual(0, len(self.b))
+
+    def test_from_file_mmap_empty(self):
+        filename = self._write_temp_file(b'')
+
+        with BitStream().from_file(filename, use_mmap=True) as self.b:
+            self.assertEqual(0, len(self.b))
+            self.assertIsNone(self.b._mmap)
+
+            self.b.append_octets(b'\x01')
+            self.assertEqual(b'\x01', self.b._buffer.bytes())
+
+    def test_from_file_mmap_is_read_only(self):
+        filename = self._write_temp_file(b'\x12')
+
+        with BitStream().from_file(filename, use_mmap=True) as self.b:
+            self.assertRaises(asn1.ReadOnlyStream, self.b.append_bit, 1)
+            self.assertRaises(asn1.ReadOnlyStream, self.b.append_uint, 1, 3)
+            self.assertRaises(asn1.ReadOnlyStream, self.b.append_octets, b'\x01')
+            self.assertEqual(0x12, self.b.read_byte())
+
+    def test_to_file(self):
+        filename = self._write_temp_file(b'')
+        self.b.append_uint(0xabc, 12)
+        self.b.to_file(filename)
+
+        with open(filename, 'rb') as file:
+            self.assertEqual(b'\xab\xc0', file.read())
+
+    def test_for_type_preallocates(self):
+        class Fixed(asn1.ASN1Type):
+            REQUIRED_BYTES_FOR_ENCODING = 4
+
+        self.b = BitStream.for_type(Fixed)
+        self.assertEqual(4, self.b._buffer.capacity)
+        self.assertEqual(0, len(self.b))
+
+        self.b.append_uint(0xabc, 12)
+        self.b.append_octets(b'\x12')
+        self.assertEqual(4, self.b._buffer.capacity)
+        self.assertEqual(bytearray(b'\xab\xc1\x20'), self.b._buffer.bytes())
+        self.assertEqual(0xabc, BitStream(self.b).read_uint(12))
+
+    def test_reset_keeps_buffer(self):
+        self.b.append_uint(0xabcdef, 24)
+        data = self.b._buffer._data
+
+        self.b.reset()
+        self.assertEqual(0, len(self.b))
+        self.assertIs(data, self.b._buffer._data)
+
+        self.b.append_uint(0x1, 4)
+        self.assertEqual(bytearray(b'\x10'), self.b._buffer.bytes())
+
+    def test_reset_detaches_buffer(self):
+        self.b = BitStream.from_buffer(b'\x12')
+        self.b.reset()
+
+        self.b.append_uint(0x3, 8)
+        self.assertEqual(bytearray(b'\x03'), self.b._buffer.bytes())
+
+    def test_pool_reuses_streams(self):
+        class Fixed(asn1.ASN1Type):
+            REQUIRED_BYTES_FOR_ENCODING = 5
+
+        pool = asn1.BitStreamPool(max_streams=1)
+
+        self.b = pool.acquire(Fixed)
+        self.assertEqual(8, self.b._buffer.capacity)
+        self.b.append_uint(0xff, 8)
+
+        pool.release(self.b)
+        pool.release(BitStream())
+        pool.release(pool.acquire(6))
+
+        self.assertIs(self.b, pool.acquire(7))
+        self.assertEqual(0, len(self.b))
+        self.assertIsNot(self.b, pool.acquire(7))
+
+    def test_pool_encode(self):
+        pool = asn1.BitStreamPool()
+
+        class Byte(asn1.PosInteger):
+            REQUIRED_BYTES_FOR_ENCODING = 1
+
+            def uper_encode(self, bit_stream):
+                bit_stream.append_byte(self._value)
+
+        self.assertEqual(b'\x07', pool.encode(Byte(7)))
+        self.assertEqual(b'\x09', pool.encode(Byte(9)))
+        self.assertIs(bytes, type(pool.encode(Byte(9))))
+
+        class Nibble(Byte):
+            REQUIRED_BYTES_FOR_ENCODING = 4
+
+            def uper_encode(self, bit_stream):
+                bit_stream.append_uint(self._value, 4)
+
+        self.assertEqual(b'\x50', pool.encode(Nibble(5)))
+
     def test_encode_decode_non_negative_integer32_0(self):
         self.b.encode_non_negative_integer32(0)
 
@@ -121,6 +352,60 @@ class BitStreamTest(TestCase):
         self.assertEqual(234210, self.b2.decode_constraint_number(234209, 234211))
         self.assertEqual(2, self.b._current_bit)
 
+    def test_encode_decode_constrained(self):
+        self.b.encode_constrained(5, 3, 10)
+        self.b.encode_constrained(7, 7, 7)
+        self.b.encode_constrained(-1, -2, 1000)
+
+        self.assertEqual(13, len(self.b))
+        self.b2 = BitStream(self.b)
+        self.assertEqual(5, self.b2.decode_constrained(3, 10))
+        self.assertEqual(7, self.b2.decode_constrained(7, 7))
+        self.assertEqual(-1, self.b2.decode_constrained(-2, 1000))
+
+    def test_encode_decode_constrained_aligned(self):
+        self.b.append_uint(0b101, 3)
+        self.b.encode_constrained(100, 0, 254, aligned=True)
+        self.b.encode_constrained(200, 0, 255, aligned=True)
+        self.b.encode_constrained(300, 0, 65535, aligned=True)
+        self.b.encode_constrained(300, 0, 2 ** 32 - 1, aligned=True)
+
+        self.assertEqual(bytearray(b'\xac\x80\xc8\x01\x2c\x40\x01\x2c'), self.b._buffer.bytes())
+        self.b2 = BitStream(self.b)
+        self.b2.read_uint(3)
+        self.assertEqual(100, self.b2.decode_constrained(0, 254, aligned=True))
+        self.assertEqual(200, self.b2.decode_constrained(0, 255, aligned=True))
+        self.assertEqual(300, self.b2.decode_constrained(0, 65535, aligned=True))
+        self.assertEqual(300, self.b2.decode_constrained(0, 2 ** 32 - 1, aligned=True))
+        self.assertTrue(self.b2.at_end())
+
+    def test_encode_constrained_out_of_range(self):
+        self.assertRaises(asn1.ConstraintException, self.b.encode_constrained, 11, 0, 10)
+
+    def test_encode_decode_number_64_bit(self):
+        values = [2 ** 63 - 1, -2 ** 63, 2 ** 32, -2 ** 32 - 1, 2 ** 200 + 7, -2 ** 200]
+        self.b.append_bit(1)
+
+        for value in values:
+            self.b.encode_number(value)
+            self.b.encode_semi_constraint_number(abs(value), -5)
+
+        self.b2 = BitStream(self.b)
+        self.b2.read_bit()
+
+        for value in values:
+            self.assertEqual(value, self.b2.decode_number())
+            self.assertEqual(abs(value), self.b2.decode_semi_constraint_number(-5))
+
+    def test_encode_number_wire_format(self):
+        self.b.encode_number(-129)
+        self.b.encode_semi_constraint_number(2 ** 32 + 10, 10)
+
+        self.assertEqual(bytearray(b'\x02\xff\x7f\x05\x01\x00\x00\x00\x00'), self.b._buffer.bytes())
+
+    def test_encode_semi_constraint_number_below_min(self):
+        self.assertRaises(asn1.ConstraintException, self.b.encode_semi_constraint_number, 4, 5)
+
     def test_encode_decode_semi_constraint_number_0(self):
         self.b.encode_semi_constraint_number(0, 0)
 
@@ -295,6 +580,33 @@ class BitStreamTest(TestCase):
         self.b2 = BitStream(self.b)
         self.assertEqual(-asn1.INFINITY, self.b2.decode_real())
 
+    def test_encode_decode_real_nan(self):
+        self.b.encode_real(asn1.NAN)
+
+        self.b2 = BitStream(self.b)
+        self.assertTrue(math.isnan(self.b2.decode_real()))
+
+    def test_encode_real_wire_format(self):
+        self.b.encode_real(-0.75)
+
+        self.assertEqual(bytearray(b'\x03\xc0\xfe\x03'), self.b._buffer.bytes())
+
+    def test_encode_decode_real_wide_exponent(self):
+        values = [1e-30, -1e300, 5e-324, asn1.DBL_MAX, asn1.DBL_MIN]
+        self.b.append_bit(1)
+
+        for value in values:
+            self.b.encode_real(value)
+
+        self.b2 = BitStream(self.b)
+        self.assertEqual(0x81, self.b2.read_uint(17) & 0xff)  # two exponent octets
+
+        self.b2 = BitStream(self.b)
+        self.b2.read_bit()
+
+        for value in values:
+            self.assertEqual(value, self.b2.decode_real())
+
     # acn
 
     def test_integer_size_bcd(self):
@@ -0,0 +1,68 @@
+from unittest import TestCase
+
+import asn1
+import sample
+from asn1 import BitStream, CharsetCodec
+
+
+class CharsetCodecTest(TestCase):
+    def setUp(self):
+        self.codec = CharsetCodec(' 0123456789')
+        self.b = BitStream()
+
+    def test_get_bits(self):
+        self.assertEqual(4, self.codec.char_width)
+        self.assertEqual((0x20a, 12), self.codec.get_bits('1 9'))
+        self.assertEqual((0, 0), self.codec.get_bits(''))
+
+    def test_encode_decode(self):
+        self.b.append_bit(1)
+        self.codec.encode(self.b, '2024 01')
+
+        self.b2 = BitStream(self.b)
+        self.b2.read_bit()
+        self.assertEqual('2024 01', self.codec.decode(self.b2, 7))
+        self.assertTrue(self.b2.at_end())
+
+    def test_char_width(self):
+        codec = CharsetCodec('abcd', 2)
+
+        self.assertEqual((0b11100100, 8), codec.get_bits('dcba'))
+        self.assertEqual('dcba', codec.get_string(0b11100100, 4))
+
+    def test_invalid_char(self):
+        self.assertRaises(asn1.ConstraintException, self.codec.get_bits, '1a')
+        self.assertRaises(asn1.ConstraintException, CharsetCodec('ab').get_bits, '0')
+
+    def test_invalid_index(self):
+        self.assertRaises(asn1.UnexpectedValueException, self.codec.get_string, 0xf, 1)
+        self.assertRaisesRegex(
+            asn1.UnexpectedValueException, 'MyNumStr', self.codec.get_string, 0xf, 1, sample.MyNumStr
+        )
+
+    def test_shared_per_type(self):
+        self.assertIs(sample.MyStr.__charset_codec__, CharsetCodec.for_type(sample.MyStr))
+        self.assertIs(CharsetCodec.for_alphabet('xyz'), CharsetCodec.for_alphabet('xyz'))
+
+    def test_subclass_alphabet(self):
+        class Digits(sample.MyNumStr):
+            __alphabet__ = '0123'
+
+        class SameDigits(sample.MyNumStr):
+            pass
+
+        self.assertEqual('0123', CharsetCodec.for_type(Digits).alphabet)
+        self.assertEqual(3, CharsetCodec.for_type(Digits).char_width)
+        self.assertEqual(' 0123456789', CharsetCodec.for_type(SameDigits).alphabet)
+        self.assertEqual(4, CharsetCodec.for_type(SameDigits).char_width)
+        self.assertIs(sample.MyNumStr.__charset_codec__, sample.MyNumStr.__dict__['__charset_codec__'])
+
+    def test_generated_type(self):
+        self.b.append_uint(0b0, 1)
+        sample.MyStr('HELLO').encode(self.b)
+        sample.MyNumStr('123').encode(self.b)
+
+        self.b2 = BitStream(self.b)
+        self.b2.read_bit()
+        self.assertEqual('HELLO', sample.MyStr().decode(self.b2).get())
+        self.assertEqual('123', sample.MyNumStr().decode(self.b2).get())
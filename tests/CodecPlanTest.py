@@ -0,0 +1,139 @@
+from unittest import TestCase
+
+import asn1
+import sample
+from asn1 import BitStream, CodecPlan
+
+
+def legacy_encode(value):
+    bit_stream = BitStream()
+    value.uper_encode(bit_stream)
+
+    return bit_stream._buffer.bytes(), len(bit_stream)
+
+
+def plan_encode(value):
+    bit_stream = BitStream()
+    CodecPlan.for_type(type(value)).encode(bit_stream, value)
+
+    return bit_stream._buffer.bytes(), len(bit_stream)
+
+
+class ContiguousSqOf(sample.MySqOf):
+    __size_range__ = (1, 20)
+
+
+def complex_message():
+    return sample.AComplexMessage(dict(
+        intVal=7,
+        int2Val=-3,
+        int3Val=11,
+        strVal='HELLO',
+        intArray=[0, 1, 2, 3, 0, 1, 2, 3, 0, 1],
+        realArray=[0.5 + i / 10 for i in range(15)],
+        octStrArray=[bytes([i]) * (1 + i % 10) for i in range(20)],
+        enumArray=[i % 3 for i in range(12)],
+        enumValue=2,
+        sqVal=dict(a_0=3, b=None, c=True),
+        enumValue2=1,
+        label=b'0123456789abc',
+        bAlpha=None,
+        bBeta=True
+    ))
+
+
+sample_values = [
+    sample.vMyBool,
+    sample.vMyInt,
+    sample.vMyIntArr,
+    sample.vMyStr,
+    sample.vMyNumStr,
+    sample.vMyBit,
+    sample.vMyOct,
+    sample.vMyReal,
+    sample.vMyEnum,
+    sample.vMyStruct,
+    sample.vMyChoice,
+    sample.MyChoice(dict(name='beta', value=-123456)),
+    sample.MyChoice(dict(name='octStr', value=b'abcd')),
+    sample.MySqOf([dict(a2=1, c2=5), dict(a2=10, b2=1.5)]),
+    ContiguousSqOf([dict(a2=1, c2=5), dict(a2=10, b2=1.5)]),
+]
+
+
+class CodecPlanTest(TestCase):
+    values = sample_values
+
+    def test_plan_kinds(self):
+        self.assertEqual('seq', CodecPlan.for_type(sample.AComplexMessage).op[0])
+        self.assertEqual('choice', CodecPlan.for_type(sample.MyChoice).op[0])
+        self.assertEqual(('int', sample.MyInt, 0, 100, 7, 7), CodecPlan.for_type(sample.MyInt).op)
+        self.assertEqual(('call', sample.MyInt2, None), CodecPlan.for_type(sample.MyInt2).op)
+        self.assertEqual('call', CodecPlan.for_type(sample.MySqOf).op[0])
+        self.assertEqual('seqof', CodecPlan.for_type(ContiguousSqOf).op[0])
+
+    def test_plan_is_cached_per_class(self):
+        plan = CodecPlan.for_type(sample.MyStr)
+
+        self.assertIs(plan, CodecPlan.for_type(sample.MyStr))
+        self.assertIsNot(plan, CodecPlan.for_type(sample.AComplexMessage.strValType))
+
+    def test_encode_matches_generated_code(self):
+        for value in self.values + [complex_message()]:
+            self.assertEqual(legacy_encode(value), plan_encode(value), type(value).__name__)
+
+    def test_decode(self):
+        for value in self.values + [complex_message()]:
+            data, _ = legacy_encode(value)
+            decoded = CodecPlan.for_type(type(value)).decode(BitStream(data))
+
+            self.assertIsInstance(decoded, type(value))
+            self.assertEqual(value.vars(), decoded.vars())
+
+    def test_decode_into_value(self):
+        data, _ = legacy_encode(sample.vMyChoice)
+        value = sample.MyChoice(dict(name='beta', value=5))
+
+        self.assertIs(value, value.decode(BitStream(data)))
+        self.assertEqual(sample.vMyChoice.vars(), value.vars())
+
+    def test_decoded_value_is_mutable(self):
+        data, _ = legacy_encode(sample.vMyChoice)
+        value = CodecPlan.for_type(sample.MyChoice).decode(BitStream(data))
+
+        value.beta = 5
+        self.assertEqual({'beta': 5}, value.vars())
+
+        self.assertRaises(asn1.ConstraintException, setattr, value, 'octStr', b'abc')
+
+    def test_call_fallback(self):
+        bit_stream = BitStream()
+        sample.MyInt2(65).encode(bit_stream)
+
+        self.assertEqual(65, sample.MyInt2().decode(BitStream(bit_stream)).get())
+
+    def test_encode_without_stream(self):
+        for value in self.values:
+            bit_stream = value.encode()
+
+            self.assertEqual(plan_encode(value), (bit_stream._buffer.bytes(), len(bit_stream)))
+            self.assertEqual(value, type(value)().decode(BitStream(bit_stream)))
+            self.assertIs(value, value.encode(BitStream()))
+
+    def test_encode_checks_ranges(self):
+        integer = sample.MyInt()
+        integer._value = 101
+        octets = sample.MyOct()
+        octets._value = b'ab'
+        array = ContiguousSqOf([dict(a2=1)])
+        array._list = array._list * 21
+
+        for value in integer, octets, array:
+            self.assertRaises(asn1.ConstraintException, plan_encode, value)
+
+    def test_decode_checks_constraints(self):
+        bit_stream = BitStream()
+        bit_stream.append_uint(127, 7)
+
+        self.assertRaises(asn1.ConstraintException, sample.MyInt().decode, BitStream(bit_stream))
+        self.assertRaises(asn1.ConstraintException, CodecPlan.for_type(sample.MyInt).decode, BitStream(bit_stream))
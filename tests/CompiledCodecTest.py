@@ -0,0 +1,147 @@
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase
+
+import asn1
+import sample
+from asn1 import BitStream, compile_codec
+
+from tests.CodecPlanTest import ContiguousSqOf, complex_message, sample_values
+
+
+class CachedInt(sample.MyInt):
+    pass
+
+
+class CompiledCodecTest(TestCase):
+    values = sample_values + [complex_message()]
+
+    def _encode(self, value):
+        bit_stream = BitStream()
+        value.encode(bit_stream)
+
+        return bytes(bit_stream._buffer.bytes()) or b'\x00'
+
+    def test_encode(self):
+        for value in self.values:
+            self.assertEqual(self._encode(value), compile_codec(type(value)).encode(asn1._to_python(value)))
+
+    def test_decode(self):
+        for value in self.values:
+            self.assertEqual(asn1._to_python(value), compile_codec(type(value)).decode(self._encode(value)))
+
+    def test_plain_values(self):
+        codec = compile_codec(sample.MyChoice)
+        value = {'alpha_0': {'a_0': 3, 'c': False}}
+
+        self.assertEqual(value, codec.decode(codec.encode(value)))
+        self.assertEqual({'octStr': b'abcd'}, codec.decode(codec.encode({'octStr': b'abcd'})))
+        self.assertEqual('0101000000000011', compile_codec(sample.MyBit).decode(b'\x50\x03'))
+        self.assertEqual(b'\x80', compile_codec(sample.MyEnum).encode('gamma'))
+
+    def test_fixed_size_arrays_are_unrolled(self):
+        source = compile_codec(sample.AComplexMessage.intArrayType).source
+
+        self.assertNotRegex(source, r'\n\s+for ')
+        self.assertNotRegex(compile_codec(sample.MyIntArr).source, r'\n\s+for ')
+        self.assertRegex(compile_codec(ContiguousSqOf).source, r'\n\s+for ')
+
+    def test_constraints(self):
+        self.assertRaises(asn1.ConstraintException, compile_codec(sample.MyInt).encode, 101)
+        self.assertRaises(asn1.ConstraintException, compile_codec(sample.MyOct).encode, b'ab')
+        self.assertRaises(asn1.ConstraintException, compile_codec(sample.MyStr).encode, 'A-B')
+        self.assertRaises(asn1.UnexpectedValueException, compile_codec(sample.MyChoice).encode, {'gamma': 1})
+
+    def test_truncated(self):
+        codec = compile_codec(sample.MyOct)
+        data = codec.encode(b'abcdef')
+
+        self.assertRaises(asn1.EndOfStream, codec.decode, data[:-1])
+
+    def test_call_fallback(self):
+        codec = compile_codec(sample.MyInt2)
+
+        self.assertEqual(65, codec.decode(codec.encode(65)))
+
+    def test_length_prefixed_integers(self):
+        for min_value, values in (None, [0, -1, 127, 128, -129, 2 ** 70]), (-5, [-5, 0, 10 ** 20]):
+            type_class = type('LengthPrefixedInt', (asn1.Integer,), {'__value_range__': (min_value, None)})
+            codec = compile_codec(type_class)
+
+            for value in values:
+                bit_stream = BitStream()
+                if min_value is None:
+                    bit_stream.encode_number(value)
+                else:
+                    bit_stream.encode_semi_constraint_number(value, min_value)
+
+                self.assertEqual(bit_stream._buffer.bytes(), codec.encode(value))
+                self.assertEqual(value, codec.decode(codec.encode(value)))
+
+        self.assertRaises(asn1.ConstraintException, codec.encode, -6)
+
+    def test_cache_dir(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            codec = compile_codec(CachedInt, cache_dir)
+            filename = os.path.join(cache_dir, '{}.{}.py'.format(CachedInt.__module__, CachedInt.__qualname__))
+
+            with open(filename) as file:
+                self.assertEqual(codec.source, file.read())
+
+            self.assertIs(codec, compile_codec(CachedInt, cache_dir))
+
+            del CachedInt.__compiled_codec__
+            with open(filename, 'a') as file:
+                file.write('# reused\n')
+
+            self.assertTrue(compile_codec(CachedInt, cache_dir).source.endswith('# reused\n'))
+
+            del CachedInt.__compiled_codec__
+            with open(filename, 'w') as file:
+                file.write('# stale\n')
+
+            self.assertEqual(codec.source, compile_codec(CachedInt, cache_dir).source)
+            self.assertEqual([os.path.basename(filename)], os.listdir(cache_dir))
+
+    def test_cache_dir_across_processes(self):
+        script = (
+            'import sys, asn1, sample\n'
+            'sys.stdout.write(asn1.compile_codec(sample.AComplexMessage, sys.argv[1]).source[-9:])\n'
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            subprocess.run([sys.executable, '-c', script, cache_dir], cwd=root, check=True)
+
+            filename, = os.listdir(cache_dir)
+            with open(os.path.join(cache_dir, filename), 'a') as file:
+                file.write('# reused\n')
+
+            result = subprocess.run([sys.executable, '-c', script, cache_dir], cwd=root, check=True,
+                                    stdout=subprocess.PIPE, universal_newlines=True)
+
+            self.assertEqual('# reused\n', result.stdout)
+
+    def test_decode_to_python(self):
+        value = complex_message()
+        decoded = asn1.decode_to_python(sample.AComplexMessage, memoryview(self._encode(value)))
+        expected = value.vars()
+        expected['octStrArray'] = [bytes([i]) * (1 + i % 10) for i in range(20)]
+        expected['label'] = b'0123456789abc'
+
+        self.assertEqual(expected, decoded)
+        self.assertEqual(sample.vMyBit.vars(), asn1.decode_to_python(sample.MyBit, self._encode(sample.vMyBit)))
+
+    def test_encode_from_python(self):
+        value = complex_message()
+        plain = asn1._to_python(value)
+        plain['enumArray'] = ['red', 'green', 'blue'] * 4
+
+        self.assertEqual(self._encode(value), asn1.encode_from_python(sample.AComplexMessage, plain))
+        self.assertRaises(asn1.NotImplementedEncoding, asn1.encode_from_python, sample.MyInt, 1, 'acn')
+        self.assertRaises(asn1.ConstraintException, asn1.encode_from_python, sample.MyEnum, 'delta')
+        self.assertRaises(asn1.ConstraintException, asn1.encode_from_python, sample.MyReal, 22.0)
+        self.assertRaises(asn1.ConstraintException, asn1.encode_from_python, ContiguousSqOf, [dict(a2=1)] * 21)
+        self.assertRaises(asn1.ConstraintException, asn1.encode_from_python, sample.MySqOf, [dict(a2=1)] * 22)
@@ -0,0 +1,53 @@
+from unittest import TestCase
+
+import asn1
+import sample
+from asn1 import BitStream
+
+
+class Catalog(asn1.Enumerated):
+    Value = asn1.Enumerated.Value('Value', [('NONE', None)] + [('cmd{}'.format(i), i * 3) for i in range(300)])
+    __simple__ = Value
+
+    def init_value(self):
+        return self.Value.cmd0
+
+
+class EnumeratedTest(TestCase):
+    def test_tables(self):
+        self.assertEqual((sample.MyEnum.Value.alpha, sample.MyEnum.Value.beta, sample.MyEnum.Value.gamma),
+                         sample.MyEnum.__enum_members__)
+        self.assertEqual({0: 0, 1: 1, 2: 2}, sample.MyEnum.__enum_indexes__)
+        self.assertEqual(300, len(Catalog.__enum_members__))
+        self.assertEqual(299, Catalog.__enum_indexes__[897])
+
+    def test_encode_decode(self):
+        bit_stream = BitStream()
+        Catalog(3).uper_encode(bit_stream)
+        Catalog(897).uper_encode(bit_stream)
+        sample.MyEnum(sample.MyEnum.Value.gamma).uper_encode(bit_stream)
+
+        self.assertEqual(9 + 9 + 2, len(bit_stream))
+        bit_stream = BitStream(bit_stream)
+
+        self.assertEqual(Catalog.Value.cmd1, self._decode(Catalog, bit_stream))
+        self.assertEqual(897, self._decode(Catalog, bit_stream))
+        self.assertEqual(sample.MyEnum.Value.gamma, self._decode(sample.MyEnum, bit_stream))
+
+    @staticmethod
+    def _decode(type_class, bit_stream):
+        value = type_class()
+        value.uper_decode(bit_stream)
+
+        return value.get()
+
+    def test_decode_invalid_index(self):
+        bit_stream = BitStream()
+        bit_stream.append_uint(3, 2)
+
+        self.assertRaises(asn1.UnexpectedOptionIndex, sample.MyEnum().uper_decode, BitStream(bit_stream))
+
+    def test_check_type(self):
+        self.assertEqual(sample.MyEnum.Value.beta, sample.MyEnum(1).get())
+        self.assertRaises(asn1.ConstraintException, Catalog, 4)
+        self.assertRaises(asn1.ConstraintException, Catalog, [3])
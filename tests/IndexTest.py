@@ -0,0 +1,88 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import asn1
+import sample
+from asn1 import BitStream
+
+from tests.CodecPlanTest import complex_message
+
+
+class IndexTest(TestCase):
+    def _write_archive(self, values):
+        handle, filename = tempfile.mkstemp()
+        self.addCleanup(os.remove, filename)
+        self.addCleanup(lambda: os.path.exists(filename + '.idx') and os.remove(filename + '.idx'))
+
+        offsets = []
+        data = bytearray()
+
+        for value in values:
+            bit_stream = BitStream()
+            value.encode(bit_stream)
+            offsets.append(len(data) * 8)
+            data += bit_stream._buffer.bytes() or b'\x00'
+
+        with os.fdopen(handle, 'wb') as file:
+            file.write(data)
+
+        return filename, offsets
+
+    def test_index_offsets(self):
+        values = [sample.MyOct(bytes(range(3 + i % 6))) for i in range(20)]
+        filename, offsets = self._write_archive(values)
+
+        with asn1.index_stream(sample.MyOct, filename) as index:
+            self.assertEqual(20, len(index))
+            self.assertEqual(offsets, [index.offset(n) for n in range(20)])
+            self.assertEqual(values[13], index.decode(13))
+
+        with asn1.StreamIndex(filename) as index:
+            self.assertIs(sample.MyOct, index.type_class)
+            self.assertEqual(values[7], index.decode(7))
+
+    def test_index_fields(self):
+        messages = [complex_message() for _ in range(3)]
+        messages[1].enumValue = 0
+        messages[2].label = b'abcdefghijk'
+        filename, offsets = self._write_archive(messages)
+
+        index_path = filename + '.fields'
+        self.addCleanup(os.remove, index_path)
+
+        with asn1.index_stream(sample.AComplexMessage, filename, ['label', 'enumValue'], index_path) as index:
+            self.assertEqual(('label', 'enumValue'), index.fields)
+            self.assertEqual([2, 0, 2], [index.decode_field(n, 'enumValue') for n in range(3)])
+            self.assertEqual(b'abcdefghijk', index.decode_field(2, 'label'))
+            self.assertLess(offsets[1], index.field_offset(1, 'label'))
+            self.assertLess(index.field_offset(1, 'label'), offsets[2])
+            self.assertEqual(0, index.view(1).enumValue)
+
+    def test_index_absent_field(self):
+        values = [sample.MyStruct(dict(a_0=1, b=None, c=True)), sample.MyStruct(dict(a_0=2, c=False))]
+        filename, _ = self._write_archive(values)
+
+        with asn1.index_stream(sample.MyStruct, filename, ['b', 'c']) as index:
+            self.assertEqual(5, index.field_offset(0, 'b'))
+            self.assertIsNone(index.field_offset(1, 'b'))
+            self.assertFalse(index.decode_field(1, 'c'))
+            self.assertRaises(AttributeError, index.decode_field, 1, 'b')
+
+    def test_index_unknown_field(self):
+        filename, _ = self._write_archive([sample.vMyInt])
+
+        self.assertRaises(asn1.UnexpectedOption, asn1.index_stream, sample.MyInt, filename, ['a'])
+
+    def test_close_with_live_view(self):
+        messages = [complex_message() for _ in range(2)]
+        messages[1].enumValue = 1
+        filename, _ = self._write_archive(messages)
+
+        index = asn1.index_stream(sample.AComplexMessage, filename)
+        view = index.view(1)
+        array_view = view.intArray
+        index.close()
+
+        self.assertEqual(1, view.enumValue)
+        self.assertEqual(3, array_view[3])
@@ -0,0 +1,74 @@
+from unittest import TestCase, mock
+
+import asn1
+import sample
+from asn1 import BitStream
+
+from tests.CodecPlanTest import ContiguousSqOf, complex_message
+
+
+def encode(value):
+    bit_stream = BitStream()
+    value.encode(bit_stream)
+
+    return bytes(bit_stream._buffer.bytes()), len(bit_stream)
+
+
+class LazyViewTest(TestCase):
+    def setUp(self):
+        self.data, self.n_bits = encode(complex_message())
+        self.view = asn1.decode_lazy(sample.AComplexMessage, self.data)
+        self.expected = asn1.decode_to_python(sample.AComplexMessage, self.data)
+
+    def test_fields(self):
+        self.assertEqual(7, self.view.intVal)
+        self.assertEqual(2, self.view.enumValue)
+        self.assertEqual(b'0123456789abc', self.view['label'])
+        self.assertEqual(self.expected, self.view.to_python())
+
+        for name in self.view.keys():
+            value = self.view[name]
+            value = value.to_python() if isinstance(value, (asn1.LazySequence, asn1.LazySequenceOf)) else value
+
+            self.assertEqual(self.expected[name], value, name)
+
+    def test_fields_are_decoded_on_access(self):
+        self.assertEqual({}, self.view._values)
+        self.assertEqual(2, self.view.enumValue)
+        self.assertEqual(['enumValue'], list(self.view._values))
+
+    def test_nested_views(self):
+        self.assertIsInstance(self.view.sqVal, asn1.LazySequence)
+        self.assertEqual(3, self.view.sqVal.a_0)
+        self.assertIsNone(self.view.sqVal.b)
+
+        octets = self.view.octStrArray
+        self.assertEqual(20, len(octets))
+        self.assertEqual(bytes([19]) * 10, octets[-1])
+        self.assertEqual(self.expected['realArray'], list(self.view.realArray))
+        self.assertRaises(IndexError, octets.__getitem__, 20)
+
+    def test_fixed_size_elements_are_not_scanned(self):
+        array = self.view.intArray
+
+        self.assertEqual(3, array[3])
+        self.assertEqual(1, len(array._offsets))
+
+    def test_sequence_of(self):
+        value = ContiguousSqOf([dict(a2=1, c2=5), dict(a2=10, b2=1.5), dict(a2=2)])
+        view = asn1.decode_lazy(ContiguousSqOf, encode(value)[0])
+
+        self.assertEqual(3, len(view))
+        self.assertEqual(1.5, view[1].b2)
+        self.assertEqual(2, view[2].a2)
+        self.assertNotIn('b2', view[2])
+        self.assertRaises(AttributeError, getattr, view[2], 'b2')
+
+    def test_end(self):
+        self.assertEqual(self.n_bits, self.view.end)
+        self.assertEqual(len(self.view.keys()) + 1, len(self.view._offsets))
+        self.assertEqual(self.view.octStrArray.end, self.view._offsets[7])
+
+    def test_elements_are_measured_in_one_pass(self):
+        with mock.patch.object(asn1, '_SKIPPERS', dict(asn1._SKIPPERS, real=None, octets=None)):
+            self.assertEqual(2, self.view.enumValue)
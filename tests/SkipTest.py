@@ -0,0 +1,98 @@
+import io
+from unittest import TestCase
+
+import asn1
+import sample
+from asn1 import BitStream, ChunkedBitStream
+
+from tests.CodecPlanTest import complex_message, sample_values
+from tests.StreamingTest import MyInt
+
+
+class SkipTest(TestCase):
+    values = sample_values + [complex_message(), sample.MyInt2(7), sample.MyInt2(65)]
+
+    def _encode(self, *values):
+        bit_stream = BitStream()
+
+        for value in values:
+            value.encode(bit_stream)
+
+        return BitStream(bit_stream)
+
+    def test_skip(self):
+        for value in self.values:
+            bit_stream = self._encode(value, sample.MyInt(42))
+            type(value).uper_skip(bit_stream)
+
+            self.assertEqual(42, sample.MyInt().decode(bit_stream).get(), type(value).__name__)
+            self.assertTrue(bit_stream.at_end())
+
+    def test_skip_from_instance(self):
+        bit_stream = self._encode(sample.vMyStr, sample.vMyOct)
+        sample.vMyStr.uper_skip(bit_stream)
+
+        self.assertEqual(sample.vMyOct, sample.MyOct().decode(bit_stream))
+
+    def test_skip_does_not_decode(self):
+        class NoDecodeBitStream(BitStream):
+            decode_real = read_octets = None
+
+        bit_stream = NoDecodeBitStream(self._encode(complex_message()))
+
+        sample.AComplexMessage.uper_skip(bit_stream)
+        self.assertTrue(bit_stream.at_end())
+
+    def test_skip_without_schema(self):
+        bit_stream = self._encode(MyInt(999), MyInt(5))
+        MyInt.uper_skip(bit_stream)
+
+        self.assertEqual(5, MyInt().decode(bit_stream).get())
+
+    def test_skip_override(self):
+        class SkippedInt(MyInt):
+            @classmethod
+            def uper_skip(cls, bit_stream):
+                bit_stream.skip(10)
+
+        bit_stream = self._encode(MyInt(999), MyInt(5))
+        asn1.CodecPlan.for_type(SkippedInt).skip(bit_stream)
+
+        self.assertEqual(5, MyInt().decode(bit_stream).get())
+
+    def test_skip_truncated(self):
+        bit_stream = BitStream.from_buffer(b'\x07\x00')
+
+        self.assertRaises(asn1.EndOfStream, sample.MyOct.uper_skip, bit_stream)
+
+    def test_skip_wide_length_prefixes(self):
+        element_op = ('octets', asn1.OctetString, 0, 1000, 10, None)
+        op = ('seqof', asn1.SequenceOf, 0, 3, 2, element_op, None)
+
+        bit_stream = BitStream()
+        bit_stream.append_uint(2, 2)
+        for length in (300, 1):
+            bit_stream.append_uint(length, 10)
+            bit_stream.append_octets(bytes(length))
+        sample.MyInt(42).encode(bit_stream)
+
+        bit_stream = BitStream(bit_stream)
+        asn1._skip_op(op, bit_stream)
+
+        self.assertEqual(42, sample.MyInt().decode(bit_stream).get())
+
+    def test_skip_truncated_elements(self):
+        data = self._encode(complex_message())._buffer.bytes()
+
+        for size in (12, 40, len(data) - 20):
+            bit_stream = BitStream.from_buffer(data[:size])
+
+            self.assertRaises(asn1.EndOfStream, sample.AComplexMessage.uper_skip, bit_stream)
+
+    def test_skip_chunked(self):
+        data = self._encode(*[sample.vMyOct] * 3)._buffer.bytes()
+        bit_stream = ChunkedBitStream(io.BytesIO(bytes(data)), chunk_size=1)
+
+        sample.MyOct.uper_skip(bit_stream)
+        sample.MyOct.uper_skip(bit_stream)
+        self.assertEqual(sample.vMyOct, sample.MyOct().decode(bit_stream))
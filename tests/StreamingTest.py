@@ -0,0 +1,197 @@
+import asyncio
+import concurrent.futures
+import io
+import socket
+from unittest import TestCase
+
+import asn1
+from asn1 import BitStream, ChunkedBitStream
+
+
+class MyInt(asn1.PosInteger):
+    REQUIRED_BYTES_FOR_ENCODING = 2
+
+    def uper_encode(self, bit_stream):
+        bit_stream.encode_constraint_number(self._value, 0, 1000)
+
+    def uper_decode(self, bit_stream):
+        value = bit_stream.decode_constraint_number(0, 1000)
+
+        self.set(value)
+
+
+class MyOct(asn1.OctetString):
+    REQUIRED_BYTES_FOR_ENCODING = 256
+
+    def uper_encode(self, bit_stream):
+        bit_stream.encode_constraint_number(len(self._value), 0, 255)
+        bit_stream.append_octets(self._value)
+
+    def uper_decode(self, bit_stream):
+        length = bit_stream.decode_constraint_number(0, 255)
+        value = bit_stream.read_octets(length)
+
+        self.set(value)
+
+
+def encode_pdus(type_class, values):
+    data = bytearray()
+
+    for value in values:
+        bit_stream = BitStream()
+        type_class(value).encode(bit_stream)
+        data += bit_stream._buffer.bytes()
+
+    return bytes(data)
+
+
+class StreamingTest(TestCase):
+    def test_chunked_bit_stream_refill(self):
+        self.b = ChunkedBitStream(io.BytesIO(b'\x12\x34\x56\x78'), chunk_size=1)
+
+        self.assertEqual(0x1, self.b.read_uint(4))
+        self.assertEqual(0x2345, self.b.read_uint(16))
+        self.assertEqual(bytearray(b'\x67'), self.b.read_octets(1))
+        self.assertFalse(self.b.at_end())
+        self.assertEqual(0x8, self.b.read_uint(4))
+        self.assertTrue(self.b.at_end())
+
+    def test_chunked_bit_stream_drops_consumed_bytes(self):
+        self.b = ChunkedBitStream(io.BytesIO(bytes(range(100))), chunk_size=4)
+
+        for i in range(100):
+            self.assertEqual(i, self.b.read_byte())
+            self.assertLessEqual(len(self.b), 5 * 8)
+
+    def test_chunked_bit_stream_end_of_stream(self):
+        self.b = ChunkedBitStream(io.BytesIO(b'\x12'))
+
+        self.assertRaises(asn1.EndOfStream, self.b.read_uint, 9)
+
+    def test_iter_decode_file(self):
+        values = [0, 1, 999, 500]
+        source = io.BytesIO(encode_pdus(MyInt, values))
+
+        self.assertEqual(values, [value.get() for value in asn1.iter_decode(MyInt, source, chunk_size=1)])
+
+    def test_iter_decode_bit_stream(self):
+        values = [b'', b'abc', bytes(200)]
+        source = BitStream.from_buffer(encode_pdus(MyOct, values))
+
+        self.assertEqual(values, [bytes(value.get()) for value in asn1.iter_decode(MyOct, source)])
+
+    def test_iter_decode_is_lazy(self):
+        source = io.BytesIO(encode_pdus(MyInt, [1, 2]) + b'\xff')
+        values = asn1.iter_decode(MyInt, source)
+
+        self.assertEqual(1, next(values).get())
+        self.assertEqual(2, next(values).get())
+        self.assertRaises(asn1.EndOfStream, next, values)
+
+    def test_iter_decode_socket(self):
+        values = [7, 8, 9]
+        sender, receiver = socket.socketpair()
+        self.addCleanup(receiver.close)
+
+        with sender:
+            sender.sendall(encode_pdus(MyOct, [bytes([value]) * value for value in values]))
+
+        decoded = [len(value.get()) for value in asn1.iter_decode(MyOct, receiver, chunk_size=3)]
+        self.assertEqual(values, decoded)
+
+    def _decode_async(self, decoder_factory, *chunks):
+        async def run():
+            reader = asyncio.StreamReader()
+
+            async def feed():
+                for chunk in chunks:
+                    reader.feed_data(chunk)
+                    await asyncio.sleep(0)
+
+                reader.feed_eof()
+
+            feeder = asyncio.ensure_future(feed())
+            values = [value.get() async for value in decoder_factory(reader)]
+            await feeder
+
+            return values
+
+        return asyncio.run(run())
+
+    def test_async_decoder_fixed_size(self):
+        data = encode_pdus(MyInt, [3, 1000, 0])
+        values = self._decode_async(lambda reader: asn1.AsyncDecoder(MyInt, reader), data[:3], data[3:])
+
+        self.assertEqual([3, 1000, 0], values)
+
+    def test_async_decoder_variable_size(self):
+        data = encode_pdus(MyOct, [b'abc', bytes(150), b''])
+        values = self._decode_async(
+            lambda reader: asn1.AsyncDecoder(MyOct, reader), data[:2], data[2:40], data[40:41], data[41:]
+        )
+
+        self.assertEqual([b'abc', bytes(150), b''], [bytes(value) for value in values])
+
+    def test_async_decoder_waits_for_missing_bytes(self):
+        class CountingDecoder(asn1.AsyncDecoder):
+            attempts = 0
+
+            def _decode_data(self, bit_stream):
+                CountingDecoder.attempts += 1
+                return super()._decode_data(bit_stream)
+
+        data = encode_pdus(MyOct, [bytes(150)])
+        values = self._decode_async(
+            lambda reader: CountingDecoder(MyOct, reader), *[data[i:i + 1] for i in range(len(data))]
+        )
+
+        self.assertEqual([bytes(150)], [bytes(value) for value in values])
+        self.assertEqual(2, CountingDecoder.attempts)
+
+    def test_async_decoder_length_prefix(self):
+        pdus = [encode_pdus(MyOct, [value]) for value in [b'x', b'yz']]
+        data = b''.join(len(pdu).to_bytes(2, 'little') + pdu for pdu in pdus)
+        values = self._decode_async(
+            lambda reader: asn1.AsyncDecoder(MyOct, reader, length_prefix=2, byteorder='little'), data
+        )
+
+        self.assertEqual([b'x', b'yz'], [bytes(value) for value in values])
+
+    def test_async_decoder_executor(self):
+        data = encode_pdus(MyInt, [5, 6])
+        values = self._decode_async(lambda reader: asn1.AsyncDecoder(MyInt, reader, executor_threshold=0), data)
+
+        self.assertEqual([5, 6], values)
+
+    def test_async_decoder_executor_threshold_is_per_pdu(self):
+        class CountingExecutor(concurrent.futures.ThreadPoolExecutor):
+            submitted = 0
+
+            def submit(self, *args, **kwargs):
+                CountingExecutor.submitted += 1
+                return super().submit(*args, **kwargs)
+
+        with CountingExecutor(1) as executor:
+            data = encode_pdus(MyOct, [b'abc'] * 50)
+            values = self._decode_async(
+                lambda reader: asn1.AsyncDecoder(MyOct, reader, executor=executor, executor_threshold=100), data
+            )
+
+            self.assertEqual([b'abc'] * 50, [bytes(value) for value in values])
+            self.assertEqual(0, CountingExecutor.submitted)
+
+            data = encode_pdus(MyOct, [bytes(150)])
+            values = self._decode_async(
+                lambda reader: asn1.AsyncDecoder(MyOct, reader, executor=executor, executor_threshold=100),
+                *[data[i:i + 1] for i in range(len(data))]
+            )
+
+            self.assertEqual([bytes(150)], [bytes(value) for value in values])
+            self.assertEqual(1, CountingExecutor.submitted)
+
+    def test_async_decoder_truncated(self):
+        data = encode_pdus(MyOct, [b'abc'])
+
+        self.assertRaises(
+            asn1.EndOfStream, self._decode_async, lambda reader: asn1.AsyncDecoder(MyOct, reader), data[:-1]
+        )